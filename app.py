@@ -1,10 +1,10 @@
 import streamlit as st
-import importlib.util
 from pathlib import Path
 
 from src.components.theme import apply_global_theme
 from src.components.layout import header, footer
-from src.components.sidebar import render_sidebar
+from src.components.sidebar import render_sidebar, render_history_controls
+from src.components.registry import PageRegistry
 
 
 PAGES_DIR = Path(__file__).parent / "src" / "pages"
@@ -22,12 +22,15 @@ PAGE_MAP = {
 }
 
 
+@st.cache_resource
+def get_page_registry() -> PageRegistry:
+    # one registry per server process: survives reruns and is shared by sessions
+    return PageRegistry(PAGES_DIR)
+
+
 def load_page_module(file_name: str):
-    file_path = PAGES_DIR / file_name
-    spec = importlib.util.spec_from_file_location(file_name.replace(".py", ""), file_path)
-    module = importlib.util.module_from_spec(spec)
-    assert spec and spec.loader
-    spec.loader.exec_module(module)
+    module, cold, elapsed_ms = get_page_registry().get(file_name)
+    st.sidebar.caption(f"Page load: {'cold' if cold else 'warm'} • {elapsed_ms:.1f} ms")
     return module
 
 
@@ -53,6 +56,8 @@ def main():
     else:
         st.error("Page module missing render() function.")
 
+    render_history_controls()
+
     footer()
 
 
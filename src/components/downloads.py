@@ -0,0 +1,83 @@
+import streamlit as st
+
+
+def _supports_deferred_download() -> bool:
+    # st.download_button accepts a callable (read only on click) since 1.50
+    try:
+        major, minor = (int(p) for p in st.__version__.split(".")[:2])
+    except ValueError:
+        return False
+    return (major, minor) >= (1, 50)
+
+
+def _format_bytes(n: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:,.0f} {unit}" if unit == "B" else f"{n:,.1f} {unit}"
+        n /= 1024
+    return f"{n:,.2f} GB"
+
+
+def _read_prepared(f) -> bytes:
+    f.seek(0)
+    return f.read()
+
+
+def render_prepared_download(slot, key, build, label, file_name, mime):
+    """
+    Two-step download for large exports. build(progress_callback) writes the
+    file (a spooled temp file, rewound) and returns (file, info); it only
+    runs when the user asks for it. The result is kept in session state under
+    `slot` until `key` (dataset version + options) changes, so the download
+    button survives reruns without rebuilding.
+
+    Writing is bounded in memory, serving is not: st.download_button hands
+    Streamlit the whole file as bytes. With deferred downloads (1.50+) the
+    bytes are read only when the button is clicked; on older versions they
+    are read once per prepared file and kept for the button.
+    """
+    ss_key = f"export_{slot}"
+    prepared = st.session_state.get(ss_key)
+    if prepared is not None and prepared["key"] != key:
+        prepared["file"].close()
+        st.session_state.pop(ss_key, None)
+        prepared = None
+
+    if prepared is None:
+        if not st.button("Prepare file", key=f"prepare_{slot}"):
+            return None
+
+        progress = st.progress(0.0, text="Writing...")
+
+        def _on_progress(frac, n_rows):
+            progress.progress(min(frac, 1.0), text=f"Wrote {n_rows:,} rows ({frac:.0%})")
+
+        try:
+            f, info = build(_on_progress)
+        except Exception as e:
+            progress.empty()
+            st.exception(e)
+            return None
+        progress.empty()
+        prepared = {"key": key, "file": f, "info": info}
+        if not _supports_deferred_download():
+            prepared["data"] = _read_prepared(f)
+        st.session_state[ss_key] = prepared
+
+    info = prepared["info"]
+    size = _format_bytes(info["bytes"])
+    when = "when the download starts" if "data" not in prepared else "for the download button"
+    st.caption(
+        f"{size} written in {info['seconds']:.2f} s. "
+        f"Streamlit serves downloads from memory, so the whole file is loaded {when}."
+    )
+
+    f = prepared["file"]
+    st.download_button(
+        label=label,
+        data=prepared["data"] if "data" in prepared else (lambda: _read_prepared(f)),
+        file_name=file_name,
+        mime=mime,
+        key=f"download_{slot}",
+    )
+    return info
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import time
+import threading
+import importlib.util
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, Tuple
+
+
+class PageRegistry:
+    """
+    Loads page modules once and hands back the cached module afterwards.
+    A page is re-executed only when its file changes on disk, so heavy
+    imports (matplotlib, seaborn, plotly, sklearn) are paid on the first
+    visit to the page that needs them and never again.
+    """
+
+    def __init__(self, pages_dir: Path):
+        self.pages_dir = Path(pages_dir)
+        self._modules: Dict[str, Tuple[ModuleType, float]] = {}
+        self._lock = threading.Lock()
+        self.timings: Dict[str, Dict[str, float]] = {}
+
+    def _exec_page(self, file_name: str) -> ModuleType:
+        file_path = self.pages_dir / file_name
+        spec = importlib.util.spec_from_file_location(file_name.replace(".py", ""), file_path)
+        assert spec and spec.loader
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    def get(self, file_name: str) -> Tuple[ModuleType, bool, float]:
+        """
+        Returns (module, cold, elapsed_ms). cold is True when the module had
+        to be executed for this call.
+        """
+        t0 = time.perf_counter()
+        mtime = (self.pages_dir / file_name).stat().st_mtime
+
+        with self._lock:
+            cached = self._modules.get(file_name)
+            if cached is not None and cached[1] == mtime:
+                module, cold = cached[0], False
+            else:
+                module, cold = self._exec_page(file_name), True
+                self._modules[file_name] = (module, mtime)
+
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        self.timings.setdefault(file_name, {})["cold_ms" if cold else "warm_ms"] = round(elapsed_ms, 3)
+        return module, cold, elapsed_ms
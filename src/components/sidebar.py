@@ -1,5 +1,7 @@
 import streamlit as st
 
+from src.utils.versioning import get_store, undo, redo
+
 
 def render_sidebar():
     with st.sidebar:
@@ -45,3 +47,33 @@ def render_sidebar():
         )
 
     return module
+
+
+def render_history_controls():
+    """
+    Undo/redo for the session dataset. Rendered after the page so the
+    buttons reflect transforms the page has just applied.
+    """
+    store = get_store(st.session_state)
+    if store is None:
+        return
+
+    with st.sidebar:
+        st.markdown("")
+        st.markdown(
+            '<div class="muted" style="font-size:12px;">Dataset history</div>',
+            unsafe_allow_html=True
+        )
+        u, r = st.columns(2)
+        with u:
+            if st.button("Undo", disabled=not store.can_undo(), use_container_width=True):
+                undo(st.session_state)
+                st.rerun()
+        with r:
+            if st.button("Redo", disabled=not store.can_redo(), use_container_width=True):
+                redo(st.session_state)
+                st.rerun()
+
+        steps = store.history()
+        if steps:
+            st.caption(" → ".join(step["label"] for step in steps[-3:]))
@@ -0,0 +1,104 @@
+from pathlib import Path
+
+
+# -------------------------
+# Ingestion
+# -------------------------
+# Streaming CSV reader: rows parsed per chunk
+STREAM_CHUNK_ROWS = 100_000
+
+# Encoding detection: size of each sampled block (head / middle / tail)
+ENCODING_SAMPLE_BYTES = 64 * 1024
+# Time budget for the statistical (chardet) fallback, in seconds
+ENCODING_DETECT_BUDGET_S = 0.25
+
+# Compact stage: object columns become `category` when distinct/rows is at most this
+COMPACT_CATEGORY_MAX_RATIO = 0.5
+
+# Excel: row ranges up to this many rows are streamed with openpyxl (stops early);
+# larger reads use calamine when installed
+EXCEL_STREAM_MAX_ROWS = 10_000
+
+
+# -------------------------
+# Caches
+# -------------------------
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache"
+
+# Parsed uploads (Feather), keyed by content hash + load options
+DATASET_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
+# Fitted preprocessing pipelines (joblib bytes, in memory, shared by all sessions)
+PIPELINE_CACHE_MAX_BYTES = 256 * 1024 ** 2
+
+# Rendered Matplotlib charts (PNG bytes, in memory, shared by all sessions)
+FIGURE_CACHE_MAX_BYTES = 128 * 1024 ** 2
+FIGURE_DPI = 144
+
+# -------------------------
+# Profiling
+# -------------------------
+# Dataset versions whose computed statistics are kept per session
+PROFILE_STORE_SIZE = 4
+
+# Column statistics kernel: numeric columns stacked per NumPy block
+STATS_BLOCK_COLUMNS = 32
+
+# Correlation engine: columns per block and worker threads (None = CPU count)
+CORR_BLOCK_COLUMNS = 64
+CORR_MAX_WORKERS = None
+# Pearson/Spearman working set per row slice (filled values, masks, squares)
+CORR_CHUNK_BYTES = 64 * 1024 ** 2
+# Correlation page draws the full heatmap up to this many columns
+CORR_HEATMAP_MAX_COLUMNS = 60
+
+# Approximate statistics (HyperLogLog distinct counts, quantile sketches)
+# switch on automatically above this many rows
+APPROX_ROW_THRESHOLD = 5_000_000
+# Rows hashed / sketched per step
+APPROX_CHUNK_ROWS = 1_000_000
+# HyperLogLog registers = 2**HLL_PRECISION (std. error ~ 1.04 / sqrt(registers))
+HLL_PRECISION = 14
+# Items per quantile sketch level (rank error bound shrinks as 1/k)
+QUANTILE_SKETCH_K = 4096
+
+# -------------------------
+# Dataset versions
+# -------------------------
+# Undo steps kept per session (older steps are folded into the base frame)
+DATASET_HISTORY_SIZE = 10
+
+# -------------------------
+# Plotting
+# -------------------------
+# Fine grid used for the binned KDE curve
+KDE_GRID_BINS = 1024
+# Bivariate scatter switches to a 2D density grid above this many points
+SCATTER_DENSITY_THRESHOLD = 50_000
+# Density grid size (x bins, y bins)
+SCATTER_DENSITY_BINS = (300, 200)
+
+
+# -------------------------
+# Export
+# -------------------------
+# Rows formatted per CSV chunk
+EXPORT_CHUNK_ROWS = 50_000
+# Exports stay in memory up to this size, then spill to a temp file on disk
+EXPORT_SPOOL_MAX_BYTES = 32 * 1024 ** 2
+# Rows per Parquet row group / Arrow record batch
+EXPORT_ROW_GROUP_ROWS = 250_000
+
+
+# -------------------------
+# Preprocessing
+# -------------------------
+# Refuse transforms whose estimated peak memory exceeds this share of available RAM
+PREPROCESS_MAX_MEMORY_FRACTION = 0.5
+# Default parallel jobs for the transformer branches (None = CPU count)
+PREPROCESS_N_JOBS = None
+# Batch mode (files larger than memory): rows kept for fitting, rows per
+# streamed chunk, and a cap on one dense output chunk
+BATCH_SAMPLE_ROWS = 100_000
+BATCH_CHUNK_ROWS = 50_000
+BATCH_CHUNK_MAX_BYTES = 256 * 1024 ** 2
@@ -1,5 +1,26 @@
 import streamlit as st
-from src.utils.io import load_dataset, set_dataframe_in_session, get_dataframe_from_session
+from src.config import STREAM_CHUNK_ROWS
+from src.utils.io import (
+    load_dataset,
+    load_dataset_cached,
+    get_dataset_cache,
+    inspect_excel,
+    inspect_parquet,
+    set_dataframe_in_session,
+    clear_dataframe_in_session,
+    get_dataframe_from_session,
+    densify_sparse,
+)
+
+
+def _excel_info(uploaded):
+    # Sheet listing is kept per upload so reruns don't reopen the workbook
+    file_key = getattr(uploaded, "file_id", None) or uploaded.name
+    cached = st.session_state.get("excel_info")
+    if cached is None or cached[0] != file_key:
+        cached = (file_key, inspect_excel(uploaded))
+        st.session_state["excel_info"] = cached
+    return cached[1]
 
 
 def render():
@@ -14,6 +35,93 @@ def render():
         accept_multiple_files=False
     )
 
+    with st.expander("Load options", expanded=False):
+        k1, k2 = st.columns([0.7, 0.3], vertical_alignment="center")
+        with k1:
+            use_cache = st.checkbox(
+                "Use dataset cache",
+                value=True,
+                help="Reuse the parsed frame when the same file is loaded again with the same options."
+            )
+        with k2:
+            if st.button("Clear dataset cache", use_container_width=True):
+                get_dataset_cache().clear()
+                st.toast("Dataset cache cleared.")
+        e1, e2 = st.columns(2)
+        with e1:
+            engine = st.selectbox(
+                "Engine",
+                ["pandas", "pyarrow"],
+                index=0,
+                help="pyarrow parses CSV with multiple threads and reads Parquet through Arrow."
+            )
+        with e2:
+            arrow_dtypes = st.checkbox(
+                "Keep Arrow-backed columns",
+                value=False,
+                disabled=engine != "pyarrow",
+                help="Keep the Arrow column types instead of converting to NumPy dtypes."
+            )
+
+        columns = None
+        row_groups = None
+        if uploaded is not None and uploaded.name.lower().endswith(".parquet"):
+            try:
+                pq_info = inspect_parquet(uploaded)
+            except Exception as e:
+                pq_info = None
+                st.warning(f"Could not read Parquet metadata: {e}")
+            if pq_info:
+                st.caption(f"Parquet: {pq_info['num_rows']:,} rows in {pq_info['num_row_groups']} row group(s)")
+                sel_cols = st.multiselect("Columns to read", pq_info["columns"], default=pq_info["columns"])
+                columns = sel_cols if sel_cols and len(sel_cols) < len(pq_info["columns"]) else None
+                n_groups = pq_info["num_row_groups"]
+                if n_groups > 1:
+                    g_from, g_to = st.slider("Row groups to read", 0, n_groups - 1, (0, n_groups - 1))
+                    if (g_from, g_to) != (0, n_groups - 1):
+                        row_groups = list(range(g_from, g_to + 1))
+
+        sheet = None
+        skip_rows = 0
+        excel_rows = 0
+        if uploaded is not None and uploaded.name.lower().endswith((".xlsx", ".xls")):
+            try:
+                xl_info = _excel_info(uploaded)
+            except Exception as e:
+                xl_info = None
+                st.warning(f"Could not read Excel sheets: {e}")
+            if xl_info:
+                sheets = {sh["name"]: sh for sh in xl_info["sheets"]}
+                sheet = st.selectbox("Sheet", list(sheets))
+                sh = sheets[sheet]
+                declared = f"{sh['rows']:,} rows" if sh["rows"] is not None else "row count unknown"
+                st.caption(f"Sheet '{sheet}': {declared}, {len(sh['columns'])} columns")
+                sel_cols = st.multiselect("Columns to read", sh["columns"], default=sh["columns"])
+                columns = sel_cols if sel_cols and len(sel_cols) < len(sh["columns"]) else None
+                x1, x2 = st.columns(2)
+                with x1:
+                    skip_rows = st.number_input("Skip first data rows", 0, None, 0, 1_000)
+                with x2:
+                    excel_rows = st.number_input("Rows to read (0 = all)", 0, None, 0, 1_000)
+
+        compact = st.checkbox(
+            "Compact dtypes",
+            value=False,
+            help="Downcast numbers to the smallest lossless width, convert low-cardinality text to category and other text to Arrow strings."
+        )
+        streaming = st.checkbox(
+            "Streaming mode (CSV, chunked)",
+            value=False,
+            help="Read the CSV in chunks instead of loading the whole upload into memory at once."
+        )
+        s1, s2, s3 = st.columns(3)
+        with s1:
+            chunk_rows = st.number_input("Rows per chunk", 1_000, 5_000_000, STREAM_CHUNK_ROWS, 10_000, disabled=not streaming)
+        with s2:
+            max_rows = st.number_input("Row limit (0 = no limit)", 0, None, 0, 100_000, disabled=not streaming)
+        with s3:
+            max_mb = st.number_input("Byte limit in MB (0 = no limit)", 0, None, 0, 100, disabled=not streaming)
+
     col_a, col_b, col_c = st.columns([0.33, 0.33, 0.34], vertical_alignment="center")
 
     with col_a:
@@ -27,8 +135,7 @@ def render():
 
     # Clear
     if clear_btn:
-        st.session_state.pop("df", None)
-        st.session_state.pop("df_meta", None)
+        clear_dataframe_in_session(st.session_state)
         st.success("Session dataset cleared.")
 
     # Load
@@ -38,9 +145,45 @@ def render():
         else:
             try:
                 with st.spinner("Loading dataset..."):
-                    df, meta = load_dataset(uploaded)
+                    progress = st.progress(0.0, text="Reading...") if streaming else None
+
+                    def _on_progress(frac, n_rows):
+                        progress.progress(frac, text=f"Read {n_rows:,} rows ({frac:.0%})")
+
+                    # each row limit only applies where its input is enabled
+                    if uploaded.name.lower().endswith((".xlsx", ".xls")):
+                        row_limit = int(excel_rows) or None
+                    else:
+                        row_limit = (int(max_rows) or None) if streaming else None
+
+                    loader = load_dataset_cached if use_cache else load_dataset
+                    df, meta = loader(
+                        uploaded,
+                        streaming=streaming,
+                        chunk_rows=int(chunk_rows),
+                        max_rows=row_limit,
+                        max_bytes=(int(max_mb) * 1024 * 1024 or None) if streaming else None,
+                        progress_callback=_on_progress if streaming else None,
+                        compact=compact,
+                        engine=engine,
+                        arrow_dtypes=arrow_dtypes,
+                        columns=columns,
+                        row_groups=row_groups,
+                        sheet=sheet,
+                        skip_rows=int(skip_rows),
+                    )
                     set_dataframe_in_session(df, meta, st.session_state)
+                    if progress is not None:
+                        progress.empty()
                 st.success(f"Loaded: {meta['file_name']}  |  Shape: {meta['rows']} x {meta['cols']}")
+                if meta.get("streaming", {}).get("truncated"):
+                    st.warning("Row/byte limit reached: only the first part of the file was loaded.")
+                replaced = meta.get("encoding_detection", {}).get("replaced_chars")
+                if replaced:
+                    st.warning(
+                        f"{replaced:,} characters could not be decoded as {meta['encoding']} "
+                        "and were replaced with \ufffd."
+                    )
             except Exception as e:
                 st.exception(e)
 
@@ -54,7 +197,7 @@ def render():
         return
 
     # Summary cards
-    left, mid, right = st.columns(3)
+    left, mid, right, mem = st.columns(4)
     with left:
         st.markdown(
             f"""
@@ -80,6 +223,18 @@ def render():
     with right:
         enc = meta.get("encoding")
         extra = f"Encoding: {enc}" if enc else "Encoding: -"
+        det = meta.get("encoding_detection")
+        if det:
+            extra += f" ({det['method']}, {det['ms']:.1f} ms)"
+            if det.get("replaced_chars"):
+                extra += f" • {det['replaced_chars']:,} replaced chars"
+        if meta.get("read_seconds") is not None:
+            reader = meta.get("excel_engine") or meta.get("engine", "pandas")
+            extra += f" • {reader} • {meta['read_seconds']:.2f}s"
+        if meta.get("sheet"):
+            extra += f" • sheet '{meta['sheet']}'"
+        if meta.get("cache", {}).get("hit"):
+            extra += f" • cache hit ({meta['cache']['seconds']:.2f}s)"
         st.markdown(
             f"""
             <div class="card">
@@ -91,9 +246,30 @@ def render():
             unsafe_allow_html=True
         )
 
+    with mem:
+        comp = meta.get("compact")
+        if comp:
+            before_mb = comp["memory_before_bytes"] / 1024 ** 2
+            after_mb = comp["memory_after_bytes"] / 1024 ** 2
+            mem_value = f"{after_mb:,.1f} MB"
+            mem_extra = f"Before compact: {before_mb:,.1f} MB"
+        else:
+            mem_value = f"{df.memory_usage(deep=True).sum() / 1024 ** 2:,.1f} MB"
+            mem_extra = "Compact: off"
+        st.markdown(
+            f"""
+            <div class="card">
+              <div class="muted" style="font-size:12px;">Memory</div>
+              <div style="font-weight:800;">{mem_value}</div>
+              <div class="muted" style="font-size:12px;">{mem_extra}</div>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
+
     st.markdown("")
     st.markdown("### Preview")
-    st.dataframe(df.head(30), use_container_width=True)
+    st.dataframe(densify_sparse(df.head(30)), use_container_width=True)
 
     st.markdown("")
     st.markdown("### Data types")
@@ -1,6 +1,7 @@
 import streamlit as st
-import pandas as pd
+from src.config import APPROX_ROW_THRESHOLD
 from src.utils.io import get_dataframe_from_session
+from src.utils.profiling import get_profile
 
 
 def render():
@@ -20,12 +21,31 @@ def render():
         )
         return
 
+    modes = {"Auto": "auto", "Exact": "exact", "Approximate": "approx"}
+    current = {v: k for k, v in modes.items()}[st.session_state.get("stats_mode", "auto")]
+    mode_label = st.radio(
+        "Statistics mode",
+        list(modes),
+        index=list(modes).index(current),
+        horizontal=True,
+        help=f"Auto uses HyperLogLog distinct counts and quantile sketches above {APPROX_ROW_THRESHOLD:,} rows."
+    )
+    st.session_state["stats_mode"] = modes[mode_label]
+
+    profile = get_profile(st.session_state)
+    if profile.approximate:
+        bounds = profile.error_bounds()
+        st.caption(
+            f"Approximate statistics: distinct counts within ±{bounds['distinct']:.1%} (95%), "
+            f"quantiles within ±{bounds['quantile_rank']:.2%} in rank."
+        )
+
     # -------------------------
     # Basic structure
     # -------------------------
     n_rows, n_cols = df.shape
-    num_cols = df.select_dtypes(include="number").columns
-    cat_cols = df.select_dtypes(exclude="number").columns
+    num_cols = profile.numeric_columns()
+    cat_cols = profile.categorical_columns()
 
     c1, c2, c3, c4 = st.columns(4)
     with c1:
@@ -73,7 +93,7 @@ def render():
     # Duplicates
     # -------------------------
     st.markdown("")
-    dup_count = df.duplicated().sum()
+    dup_count = profile.duplicate_rows()
     st.markdown(
         f"""
         <div class="card">
@@ -90,11 +110,7 @@ def render():
     st.markdown("")
     st.markdown("### Unique values per column")
     unique_df = (
-        pd.DataFrame({
-            "column": df.columns,
-            "unique_values": [df[col].nunique(dropna=True) for col in df.columns],
-            "dtype": df.dtypes.astype(str).values
-        })
+        profile.column_summary()[["column", "unique_values", "dtype"]]
         .sort_values("unique_values", ascending=False)
     )
     st.dataframe(unique_df, use_container_width=True)
@@ -107,5 +123,5 @@ def render():
     if len(num_cols) == 0:
         st.info("No numeric columns found.")
     else:
-        desc = df[num_cols].describe().T
+        desc = profile.describe()
         st.dataframe(desc, use_container_width=True)
@@ -2,7 +2,10 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 
-from src.utils.io import get_dataframe_from_session, set_dataframe_in_session
+from src.utils.io import densify_sparse, get_dataframe_from_session
+from src.utils.versioning import apply_transform
+from src.utils.profiling import get_profile
+from src.utils.plotting import cached_figure
 
 
 def render():
@@ -22,16 +25,11 @@ def render():
     # =========================
     # Missing summary
     # =========================
-    miss_count = df.isna().sum()
-    miss_pct = (miss_count / len(df)) * 100
+    profile = get_profile(st.session_state)
+    miss_count = profile.missing_counts()
 
     summary = (
-        pd.DataFrame({
-            "column": df.columns,
-            "missing_count": miss_count.values,
-            "missing_pct": miss_pct.values,
-            "dtype": df.dtypes.astype(str).values
-        })
+        profile.column_summary()[["column", "missing_count", "missing_pct", "dtype"]]
         .sort_values("missing_count", ascending=False)
     )
 
@@ -66,32 +64,34 @@ def render():
     st.markdown("")
     st.markdown("### Missing values per column (Bar chart)")
 
-    plot_df = summary.copy()
+    def _missing_bar():
+        plot_df = summary.copy()
 
-    fig, ax = plt.subplots(figsize=(12, 5))
+        fig, ax = plt.subplots(figsize=(12, 5))
 
-    ax.bar(
-        plot_df["column"],
-        plot_df["missing_count"],
-        color="#1f2937",          # dark gray (clear & professional)
-        edgecolor="black",
-        linewidth=0.8
-    )
+        ax.bar(
+            plot_df["column"],
+            plot_df["missing_count"],
+            color="#1f2937",          # dark gray (clear & professional)
+            edgecolor="black",
+            linewidth=0.8
+        )
 
-    ax.set_title("Missing Values per Column", fontsize=14, fontweight="bold")
-    ax.set_xlabel("Columns")
-    ax.set_ylabel("Missing Count")
+        ax.set_title("Missing Values per Column", fontsize=14, fontweight="bold")
+        ax.set_xlabel("Columns")
+        ax.set_ylabel("Missing Count")
 
-    ax.tick_params(axis="x", rotation=45, labelsize=9)
-    ax.tick_params(axis="y", labelsize=9)
+        ax.tick_params(axis="x", rotation=45, labelsize=9)
+        ax.tick_params(axis="y", labelsize=9)
 
-    ax.grid(axis="y", linestyle="--", alpha=0.4)
+        ax.grid(axis="y", linestyle="--", alpha=0.4)
 
-    # Important: show zeros clearly
-    ax.set_ylim(bottom=0)
+        # Important: show zeros clearly
+        ax.set_ylim(bottom=0)
+        return fig
 
-    st.pyplot(fig, clear_figure=True)
-    plt.close(fig)
+    png = cached_figure(profile.fingerprint, "missing_bar", None, _missing_bar)
+    st.image(png, use_container_width=True)
 
     if total_missing == 0:
         st.info("No missing values detected. All bars at zero indicate complete data.")
@@ -114,8 +114,7 @@ def render():
             st.code(", ".join(cols_to_drop))
 
         if st.button("Apply: Drop columns", type="primary"):
-            new_df = df.drop(columns=cols_to_drop)
-            set_dataframe_in_session(new_df, meta, st.session_state)
+            new_df = apply_transform(st.session_state, "Drop columns", dropped=cols_to_drop)
             st.success(f"Applied. New shape: {new_df.shape}")
 
     # Drop rows
@@ -126,33 +125,44 @@ def render():
             if not selected_cols:
                 st.error("Select at least one column.")
             else:
-                new_df = df.dropna(subset=selected_cols, how=how)
-                set_dataframe_in_session(new_df, meta, st.session_state)
+                present = df[selected_cols].notna()
+                keep = present.all(axis=1) if how == "any" else present.any(axis=1)
+                new_df = apply_transform(st.session_state, f"Drop rows ({how})", row_mask=keep.to_numpy())
                 st.success(f"Applied. New rows: {new_df.shape[0]}")
 
     # Impute
     with tabs[2]:
-        num_cols = df.select_dtypes(include="number").columns.tolist()
-        cat_cols = [c for c in df.columns if c not in num_cols]
+        num_cols = profile.numeric_columns()
+        cat_cols = profile.categorical_columns()
 
         strategy = st.selectbox("Numeric strategy", ["mean", "median", "zero"])
         if st.button("Apply: Impute", type="primary"):
-            new_df = df.copy()
+            # only columns that actually have missing values are rewritten
+            changed = {}
 
-            if num_cols:
+            num_missing = [c for c in num_cols if miss_count[c] > 0]
+            if num_missing:
                 if strategy == "mean":
-                    new_df[num_cols] = new_df[num_cols].fillna(new_df[num_cols].mean())
+                    fill = df[num_missing].mean()
                 elif strategy == "median":
-                    new_df[num_cols] = new_df[num_cols].fillna(new_df[num_cols].median())
+                    fill = df[num_missing].median()
                 else:
-                    new_df[num_cols] = new_df[num_cols].fillna(0)
-
-            if cat_cols:
-                new_df[cat_cols] = new_df[cat_cols].fillna("Unknown")
-
-            set_dataframe_in_session(new_df, meta, st.session_state)
+                    fill = pd.Series(0, index=num_missing)
+                for c in num_missing:
+                    changed[c] = df[c].fillna(fill[c])
+
+            for c in cat_cols:
+                if miss_count[c] == 0:
+                    continue
+                s = df[c]
+                # compact loads store text as category: register the fill value first
+                if isinstance(s.dtype, pd.CategoricalDtype) and "Unknown" not in s.cat.categories:
+                    s = s.cat.add_categories("Unknown")
+                changed[c] = s.fillna("Unknown")
+
+            apply_transform(st.session_state, f"Impute ({strategy})", changed=changed)
             st.success("Imputation applied.")
 
     st.markdown("")
     st.markdown("### Post-action preview")
-    st.dataframe(st.session_state["df"].head(20), use_container_width=True)
+    st.dataframe(densify_sparse(st.session_state["df"].head(20)), use_container_width=True)
@@ -1,12 +1,57 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
 
 import matplotlib.pyplot as plt
-import seaborn as sns
 import plotly.express as px
 
 from src.utils.io import get_dataframe_from_session
+from src.utils.plotting import (
+    finite_values,
+    histogram_data,
+    kde_curve,
+    box_stats,
+    plotly_histogram,
+    mpl_histogram_kde,
+    mpl_boxplot,
+    cached_figure,
+)
+from src.utils.profiling import get_profile
+from src.utils.stats import is_numeric_column
+
+
+def _numeric_charts(profile, s, col, stats):
+    # Aggregates over all rows, computed once per column and dataset version;
+    # the charts only receive bin counts / curve points / box statistics
+    bins = st.slider("Histogram bins", 10, 200, 40, 5)
+
+    def _dist():
+        values = finite_values(s)
+        return {
+            "kde": kde_curve(values),
+            "box": box_stats(values, stats["q1"], stats["median"], stats["q3"]),
+        }
+
+    dist = profile.cached(("dist", col, profile.approximate), _dist)
+    hist = profile.cached(("hist", col, bins), lambda: histogram_data(finite_values(s), bins))
+
+    st.markdown("")
+    st.markdown("### Distribution (Plotly)")
+    fig = plotly_histogram(hist, f"Histogram: {col}", col)
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.markdown("### Distribution + KDE")
+    png = cached_figure(
+        profile.fingerprint, "hist_kde", [col, bins],
+        lambda: mpl_histogram_kde(hist, dist["kde"], f"Histogram + KDE: {col}", col),
+    )
+    st.image(png, use_container_width=True)
+
+    st.markdown("### Boxplot (Outlier view)")
+    png = cached_figure(
+        profile.fingerprint, "boxplot", [col, profile.approximate],
+        lambda: mpl_boxplot(dist["box"], f"Boxplot: {col}", col),
+    )
+    st.image(png, use_container_width=True)
+    st.caption(f"{dist['box']['n_outliers']:,} values outside the 1.5×IQR whiskers.")
 
 
 def render():
@@ -29,19 +74,15 @@ def render():
     col = st.selectbox("Select a column", cols, index=0)
 
     s = df[col]
-    is_num = pd.api.types.is_numeric_dtype(s)
-
-    # Optional sampling for plots (keeps charts readable/performance stable)
-    max_plot_n = st.slider("Max rows for plots (sampling if needed)", 500, 20000, 5000, 500)
-    plot_s = s.dropna()
-    if len(plot_s) > max_plot_n:
-        plot_s = plot_s.sample(max_plot_n, random_state=42)
+    is_num = is_numeric_column(s)
+    profile = get_profile(st.session_state)
+    stats = profile.column_stats([col]).loc[col]
 
     # -------------------------
     # Summary cards
     # -------------------------
-    missing = int(s.isna().sum())
-    unique = int(s.nunique(dropna=True))
+    missing = int(stats["missing"])
+    unique = int(stats["distinct"])
     total = int(len(s))
 
     c1, c2, c3, c4 = st.columns(4)
@@ -61,50 +102,22 @@ def render():
     # -------------------------
     if is_num:
         st.markdown("### Numeric summary")
-        desc = s.describe()
-        q1 = float(s.quantile(0.25)) if s.dropna().size else np.nan
-        q3 = float(s.quantile(0.75)) if s.dropna().size else np.nan
-        iqr = q3 - q1 if pd.notna(q3) and pd.notna(q1) else np.nan
+        iqr = stats["q3"] - stats["q1"]
 
         t1, t2, t3, t4 = st.columns(4)
         with t1:
-            st.markdown(f"<div class='card'><b>Mean</b><br>{desc.get('mean', np.nan):.4g}</div>", unsafe_allow_html=True)
+            st.markdown(f"<div class='card'><b>Mean</b><br>{stats['mean']:.4g}</div>", unsafe_allow_html=True)
         with t2:
-            st.markdown(f"<div class='card'><b>Std</b><br>{desc.get('std', np.nan):.4g}</div>", unsafe_allow_html=True)
+            st.markdown(f"<div class='card'><b>Std</b><br>{stats['std']:.4g}</div>", unsafe_allow_html=True)
         with t3:
-            st.markdown(f"<div class='card'><b>Median</b><br>{desc.get('50%', np.nan):.4g}</div>", unsafe_allow_html=True)
+            st.markdown(f"<div class='card'><b>Median</b><br>{stats['median']:.4g}</div>", unsafe_allow_html=True)
         with t4:
             st.markdown(f"<div class='card'><b>IQR</b><br>{iqr:.4g}</div>", unsafe_allow_html=True)
 
-        st.markdown("")
-        st.markdown("### Distribution (Plotly)")
-        fig = px.histogram(
-            plot_s.to_frame(name=col),
-            x=col,
-            nbins=40,
-            title=f"Histogram: {col}"
-        )
-        fig.update_layout(bargap=0.02)
-        st.plotly_chart(fig, use_container_width=True)
-
-        st.markdown("### Distribution + KDE (Seaborn)")
-        fig2, ax = plt.subplots(figsize=(12, 4))
-        sns.histplot(plot_s, bins=40, kde=True, ax=ax)
-        ax.set_title(f"Histogram + KDE: {col}")
-        ax.set_xlabel(col)
-        ax.set_ylabel("Count")
-        ax.grid(axis="y", linestyle="--", alpha=0.3)
-        st.pyplot(fig2, clear_figure=True)
-        plt.close(fig2)
-
-        st.markdown("### Boxplot (Outlier view)")
-        fig3, ax3 = plt.subplots(figsize=(12, 2.5))
-        sns.boxplot(x=plot_s, ax=ax3)
-        ax3.set_title(f"Boxplot: {col}")
-        ax3.set_xlabel(col)
-        ax3.grid(axis="x", linestyle="--", alpha=0.3)
-        st.pyplot(fig3, clear_figure=True)
-        plt.close(fig3)
+        if stats["count"] == 0:
+            st.info("Column has no values to plot.")
+        else:
+            _numeric_charts(profile, s, col, stats)
 
     # -------------------------
     # Categorical / text analysis
@@ -125,15 +138,18 @@ def render():
         st.plotly_chart(fig, use_container_width=True)
 
         st.markdown("### Bar chart (Matplotlib)")
-        fig2, ax = plt.subplots(figsize=(12, 5))
-        ax.bar(freq_df["category"], freq_df["count"], color="#1f2937", edgecolor="black", linewidth=0.6)
-        ax.set_title(f"Top {top_k} categories: {col}", fontsize=14, fontweight="bold")
-        ax.set_xlabel("Category")
-        ax.set_ylabel("Count")
-        ax.tick_params(axis="x", rotation=45)
-        ax.grid(axis="y", linestyle="--", alpha=0.3)
-        st.pyplot(fig2, clear_figure=True)
-        plt.close(fig2)
+        def _freq_bar():
+            fig2, ax = plt.subplots(figsize=(12, 5))
+            ax.bar(freq_df["category"], freq_df["count"], color="#1f2937", edgecolor="black", linewidth=0.6)
+            ax.set_title(f"Top {top_k} categories: {col}", fontsize=14, fontweight="bold")
+            ax.set_xlabel("Category")
+            ax.set_ylabel("Count")
+            ax.tick_params(axis="x", rotation=45)
+            ax.grid(axis="y", linestyle="--", alpha=0.3)
+            return fig2
+
+        png = cached_figure(profile.fingerprint, "freq_bar", [col, top_k], _freq_bar)
+        st.image(png, use_container_width=True)
 
     st.markdown("")
     st.markdown("### Raw preview (first 50 non-null values)")
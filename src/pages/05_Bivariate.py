@@ -7,6 +7,9 @@ import seaborn as sns
 import plotly.express as px
 
 from src.utils.io import get_dataframe_from_session
+from src.utils.profiling import get_profile
+from src.utils.plotting import density_grid, linear_fit, mpl_density, paired_values, plotly_density
+from src.config import SCATTER_DENSITY_BINS, SCATTER_DENSITY_THRESHOLD
 
 
 def render():
@@ -41,8 +44,6 @@ def render():
     x_num = pd.api.types.is_numeric_dtype(x)
     y_num = pd.api.types.is_numeric_dtype(y)
 
-    plot_df = df[[x_col, y_col]].dropna()
-
     st.markdown("")
 
     # =========================
@@ -52,8 +53,9 @@ def render():
         st.markdown("### Numeric × Numeric")
 
         # Correlation
-        pearson = plot_df[x_col].corr(plot_df[y_col], method="pearson")
-        spearman = plot_df[x_col].corr(plot_df[y_col], method="spearman")
+        profile = get_profile(st.session_state)
+        pearson = profile.pair_correlation(x_col, y_col, method="pearson")
+        spearman = profile.pair_correlation(x_col, y_col, method="spearman")
 
         c1, c2 = st.columns(2)
         with c1:
@@ -63,23 +65,67 @@ def render():
 
         st.markdown("")
 
-        # Scatter (Plotly)
-        fig = px.scatter(
-            plot_df,
-            x=x_col,
-            y=y_col,
-            title=f"Scatter: {x_col} vs {y_col}",
-            opacity=0.7
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        # pairing, fit and grid are all memoized: a rerun makes no data pass
+        def _fit():
+            xv, yv = paired_values(x, y)
+            return {"n": int(xv.size), "fit": linear_fit(xv, yv)}
+
+        summary = profile.cached(("linear_fit", x_col, y_col), _fit)
+        n_points, fit = summary["n"], summary["fit"]
 
-        # Scatter + regression (Seaborn)
-        fig2, ax = plt.subplots(figsize=(10, 4))
-        sns.regplot(x=x_col, y=y_col, data=plot_df, ax=ax, scatter_kws={"alpha": 0.6})
-        ax.set_title(f"{x_col} vs {y_col} (Trend)")
-        ax.grid(True, linestyle="--", alpha=0.3)
-        st.pyplot(fig2, clear_figure=True)
-        plt.close(fig2)
+        mode = st.radio(
+            "Scatter mode",
+            ["Auto", "Points", "Density"],
+            horizontal=True,
+            help=f"Auto draws a density grid above {SCATTER_DENSITY_THRESHOLD:,} points.",
+        )
+        use_density = mode == "Density" or (mode == "Auto" and n_points > SCATTER_DENSITY_THRESHOLD)
+
+        if fit is not None:
+            st.caption(
+                f"OLS fit on {n_points:,} points: {y_col} = {fit['slope']:.4g} × {x_col} + {fit['intercept']:.4g}"
+                f"  (R² = {fit['r2']:.4f})"
+            )
+
+        if use_density:
+            grid = profile.cached(
+                ("density", x_col, y_col, SCATTER_DENSITY_BINS),
+                lambda: density_grid(*paired_values(x, y), bins=SCATTER_DENSITY_BINS),
+            )
+
+            # Density heatmap (Plotly)
+            fig = plotly_density(grid, fit, f"Density: {x_col} vs {y_col}", x_col, y_col)
+            st.plotly_chart(fig, use_container_width=True)
+
+            # Density + regression (Matplotlib)
+            fig2 = mpl_density(grid, fit, f"{x_col} vs {y_col} (Trend)", x_col, y_col)
+            st.pyplot(fig2, clear_figure=True)
+            plt.close(fig2)
+        else:
+            xv, yv = paired_values(x, y)
+
+            # Scatter (Plotly)
+            fig = px.scatter(
+                x=xv,
+                y=yv,
+                labels={"x": x_col, "y": y_col},
+                title=f"Scatter: {x_col} vs {y_col}",
+                opacity=0.7
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
+            # Scatter + regression (Matplotlib)
+            fig2, ax = plt.subplots(figsize=(10, 4))
+            ax.scatter(xv, yv, alpha=0.6, s=12)
+            if fit is not None:
+                xs = np.array([fit["x_min"], fit["x_max"]])
+                ax.plot(xs, fit["slope"] * xs + fit["intercept"], color="#F97316", linewidth=2)
+            ax.set_title(f"{x_col} vs {y_col} (Trend)")
+            ax.set_xlabel(x_col)
+            ax.set_ylabel(y_col)
+            ax.grid(True, linestyle="--", alpha=0.3)
+            st.pyplot(fig2, clear_figure=True)
+            plt.close(fig2)
 
     # =========================
     # Numeric × Categorical
@@ -93,6 +139,7 @@ def render():
             num_col, cat_col = y_col, x_col
 
         st.markdown(f"**Numeric:** {num_col}  |  **Categorical:** {cat_col}")
+        plot_df = df[[x_col, y_col]].dropna()
 
         # Boxplot
         fig, ax = plt.subplots(figsize=(10, 4))
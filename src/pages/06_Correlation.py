@@ -0,0 +1,84 @@
+import streamlit as st
+import plotly.express as px
+
+from src.config import CORR_HEATMAP_MAX_COLUMNS
+from src.utils.io import get_dataframe_from_session
+from src.utils.profiling import get_profile
+
+
+def render():
+    st.subheader("06) Correlation")
+    st.markdown(
+        '<div class="muted">Pairwise correlation between numeric columns (Pearson / Spearman / Kendall).</div>',
+        unsafe_allow_html=True
+    )
+    st.markdown("")
+
+    df, _ = get_dataframe_from_session(st.session_state)
+    if df is None:
+        st.markdown('<div class="card">No dataset loaded.</div>', unsafe_allow_html=True)
+        return
+
+    profile = get_profile(st.session_state)
+    num_cols = profile.numeric_columns()
+    if len(num_cols) < 2:
+        st.info("At least two numeric columns are needed for correlation analysis.")
+        return
+
+    # -------------------------
+    # Options
+    # -------------------------
+    c1, c2 = st.columns([0.3, 0.7])
+    with c1:
+        method = st.selectbox("Method", ["pearson", "spearman", "kendall"], index=0)
+        top_k = st.slider("Top K pairs", 5, 100, 20, 5)
+    with c2:
+        cols = st.multiselect("Columns", num_cols, default=num_cols)
+
+    if len(cols) < 2:
+        st.warning("Select at least two columns.")
+        return
+
+    if method == "kendall" and len(df) * len(cols) ** 2 > 5e8:
+        st.info("Kendall is computed pair by pair and can take a while on large selections.")
+
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        st.markdown(f"<div class='card'><b>Columns</b><br>{len(cols)}</div>", unsafe_allow_html=True)
+    with c2:
+        st.markdown(f"<div class='card'><b>Pairs</b><br>{len(cols) * (len(cols) - 1) // 2:,}</div>", unsafe_allow_html=True)
+    with c3:
+        st.markdown(f"<div class='card'><b>Method</b><br>{method.title()}</div>", unsafe_allow_html=True)
+
+    # -------------------------
+    # Top pairs
+    # -------------------------
+    st.markdown("")
+    st.markdown(f"### Top {top_k} pairs by |correlation|")
+    with st.spinner("Computing correlations..."):
+        top = profile.top_correlated_pairs(k=top_k, method=method, columns=cols)
+    st.dataframe(top.rename(columns={"n": "rows_used"}), use_container_width=True)
+
+    # -------------------------
+    # Heatmap
+    # -------------------------
+    st.markdown("")
+    st.markdown("### Correlation matrix")
+    if len(cols) > CORR_HEATMAP_MAX_COLUMNS:
+        st.info(
+            f"{len(cols)} columns selected: the full matrix is only drawn for up to "
+            f"{CORR_HEATMAP_MAX_COLUMNS} columns. Narrow the selection to see it."
+        )
+        return
+
+    corr = profile.correlation(method=method, columns=cols)
+    fig = px.imshow(
+        corr,
+        zmin=-1,
+        zmax=1,
+        color_continuous_scale="RdBu_r",
+        text_auto=".2f" if len(cols) <= 15 else False,
+        aspect="auto",
+        title=f"{method.title()} correlation"
+    )
+    st.plotly_chart(fig, use_container_width=True)
@@ -1,26 +1,18 @@
+import numpy as np
 import streamlit as st
 import pandas as pd
-import numpy as np
-
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-from src.utils.io import get_dataframe_from_session, set_dataframe_in_session
-
 
-def detect_outliers_iqr(series):
-    q1 = series.quantile(0.25)
-    q3 = series.quantile(0.75)
-    iqr = q3 - q1
-    lower = q1 - 1.5 * iqr
-    upper = q3 + 1.5 * iqr
-    return lower, upper
+from src.utils.io import densify_sparse, get_dataframe_from_session
+from src.utils.plotting import box_stats, cached_figure, finite_values, mpl_boxplot
+from src.utils.profiling import get_profile
+from src.utils.stats import OUTLIER_METHODS, column_mad, outlier_bounds, outlier_scan
+from src.utils.versioning import apply_transform
 
 
 def render():
     st.subheader("07) Outlier Analysis")
     st.markdown(
-        '<div class="muted">Detect and handle outliers using the IQR method.</div>',
+        '<div class="muted">Detect and handle outliers across all numeric columns (IQR, z-score or MAD).</div>',
         unsafe_allow_html=True
     )
     st.markdown("")
@@ -31,60 +23,90 @@ def render():
         return
 
     # =========================
-    # Column selection
+    # Method
     # =========================
-    num_cols = df.select_dtypes(include="number").columns.tolist()
+    profile = get_profile(st.session_state)
+    num_cols = profile.numeric_columns()
     if not num_cols:
         st.info("No numeric columns available for outlier analysis.")
         return
 
-    col = st.selectbox("Select numeric column", num_cols)
-
-    s = df[col].dropna()
+    m1, m2 = st.columns(2)
+    with m1:
+        method = st.radio("Method", list(OUTLIER_METHODS), horizontal=True)
+    with m2:
+        k = st.number_input(
+            "Threshold k", 0.1, None, OUTLIER_METHODS[method], 0.1, key=f"outlier_k_{method}",
+            help="IQR: q1 - k·IQR .. q3 + k·IQR. Z-score: mean ± k·std. MAD: median ± k·1.4826·MAD.",
+        )
 
-    if s.empty:
-        st.warning("Selected column contains only missing values.")
-        return
-
-    # =========================
-    # IQR computation
     # =========================
-    lower, upper = detect_outliers_iqr(s)
-
-    outliers = s[(s < lower) | (s > upper)]
-    outlier_ratio = len(outliers) / len(s) * 100
-
+    # Bounds + counts for all numeric columns (one pass, memoized per version)
     # =========================
-    # Summary cards
-    # =========================
-    c1, c2, c3, c4 = st.columns(4)
+    stats = profile.column_stats(num_cols)
+
+    def _scan():
+        mad = column_mad(profile.df, num_cols, stats["median"]) if method == "MAD" else None
+        bounds = outlier_bounds(stats, method, k, mad)
+        counts, _ = outlier_scan(profile.df, bounds)
+        return bounds, counts
+
+    bounds, counts = profile.cached(("outliers", method, k, profile.approximate), _scan)
+    if profile.approximate and method != "MAD":
+        st.caption(f"Bounds from approximate statistics: quantiles within ±{profile.error_bounds(num_cols)['quantile_rank']:.2%} in rank.")
+
+    summary = pd.DataFrame({
+        "column": num_cols,
+        "values": stats["count"].to_numpy(),
+        "lower": bounds["lower"].to_numpy(),
+        "upper": bounds["upper"].to_numpy(),
+        "outliers": counts.to_numpy(),
+    })
+    with np.errstate(invalid="ignore", divide="ignore"):
+        summary["outlier_pct"] = np.where(summary["values"] > 0, summary["outliers"] / summary["values"] * 100, 0.0)
+
+    c1, c2, c3 = st.columns(3)
     with c1:
-        st.markdown(f"<div class='card'><b>Total values</b><br>{len(s)}</div>", unsafe_allow_html=True)
+        st.markdown(f"<div class='card'><b>Numeric columns</b><br>{len(num_cols)}</div>", unsafe_allow_html=True)
     with c2:
-        st.markdown(f"<div class='card'><b>Outliers</b><br>{len(outliers)}</div>", unsafe_allow_html=True)
+        st.markdown(f"<div class='card'><b>Columns with outliers</b><br>{int((counts > 0).sum())}</div>", unsafe_allow_html=True)
     with c3:
-        st.markdown(f"<div class='card'><b>Outlier %</b><br>{outlier_ratio:.2f}%</div>", unsafe_allow_html=True)
-    with c4:
-        st.markdown(f"<div class='card'><b>IQR range</b><br>[{lower:.3g}, {upper:.3g}]</div>", unsafe_allow_html=True)
+        st.markdown(f"<div class='card'><b>Outlier values</b><br>{int(counts.sum()):,}</div>", unsafe_allow_html=True)
+
+    st.markdown("")
+    st.markdown("### Outlier summary")
+    st.dataframe(
+        summary.sort_values("outliers", ascending=False).style.format(
+            {"lower": "{:.4g}", "upper": "{:.4g}", "outlier_pct": "{:.2f}%"}
+        ),
+        use_container_width=True,
+        hide_index=True,
+    )
 
     # =========================
-    # Visualization
+    # Column detail
     # =========================
     st.markdown("")
-    st.markdown("### Boxplot (outlier visualization)")
+    st.markdown("### Column detail")
+    col = st.selectbox("Select numeric column", num_cols)
+    s = df[col].dropna()
 
-    fig, ax = plt.subplots(figsize=(10, 3))
-    sns.boxplot(x=s, ax=ax)
-    ax.set_title(f"Boxplot: {col}")
-    ax.grid(axis="x", linestyle="--", alpha=0.3)
-    st.pyplot(fig, clear_figure=True)
-    plt.close(fig)
+    if s.empty:
+        st.warning("Selected column contains only missing values.")
+    else:
+        lower, upper = bounds.loc[col, "lower"], bounds.loc[col, "upper"]
+        col_stats = stats.loc[col]
 
-    # =========================
-    # Show outliers
-    # =========================
-    st.markdown("### Detected outliers (sample)")
-    st.write(outliers.sort_values().head(20).tolist())
+        def _boxplot():
+            box = box_stats(finite_values(s), col_stats["q1"], col_stats["median"], col_stats["q3"])
+            return mpl_boxplot(box, f"Boxplot: {col}", col, figsize=(10, 3))
+
+        png = cached_figure(profile.fingerprint, "outlier_boxplot", [col, profile.approximate], _boxplot)
+        st.image(png, use_container_width=True)
+
+        st.caption(f"{method} bounds: [{lower:.4g}, {upper:.4g}]")
+        st.markdown("#### Detected outliers (sample)")
+        st.write(s[(s < lower) | (s > upper)].sort_values().head(20).tolist())
 
     # =========================
     # Treatment
@@ -92,37 +114,48 @@ def render():
     st.markdown("")
     st.markdown("### Treatment")
 
+    flagged = counts.index[counts > 0].tolist()
+    targets = st.multiselect("Columns to treat", num_cols, default=flagged)
+
     action = st.radio(
         "Choose action",
         ["None", "Remove outliers", "Cap (Winsorize)"],
         index=0
     )
 
-    if action != "None":
+    if action != "None" and targets:
         apply = st.button("Apply outlier treatment", type="primary")
 
         if apply:
-            new_df = df.copy()
-
-            if action == "Remove outliers":
-                mask = (new_df[col] >= lower) & (new_df[col] <= upper)
-                new_df = new_df[mask]
-
-            elif action == "Cap (Winsorize)":
-                new_df[col] = new_df[col].clip(lower=lower, upper=upper)
-
+            target_bounds = bounds.loc[targets]
             new_meta = dict(meta or {})
             new_meta["outlier_treatment"] = {
-                "column": col,
-                "method": "IQR",
+                "method": method,
+                "k": float(k),
                 "action": action,
-                "lower": float(lower),
-                "upper": float(upper),
+                "bounds": {
+                    str(c): [float(row.lower), float(row.upper)] for c, row in target_bounds.iterrows()
+                },
             }
+            what = targets[0] if len(targets) == 1 else f"{len(targets)} columns"
 
-            set_dataframe_in_session(new_df, new_meta, st.session_state)
+            if action == "Remove outliers":
+                # one combined mask over all target columns; rows with missing values stay
+                _, any_outlier = outlier_scan(df, target_bounds)
+                new_df = apply_transform(
+                    st.session_state, f"Remove outliers ({method}): {what}", meta=new_meta, row_mask=~any_outlier
+                )
+            else:
+                # only columns that actually have outliers get a new array
+                changed = {
+                    c: df[c].clip(lower=target_bounds.loc[c, "lower"], upper=target_bounds.loc[c, "upper"])
+                    for c in targets if counts[c] > 0
+                }
+                new_df = apply_transform(
+                    st.session_state, f"Cap outliers ({method}): {what}", meta=new_meta, changed=changed
+                )
             st.success(f"Outlier treatment applied. New shape: {new_df.shape}")
 
     st.markdown("")
     st.markdown("### Preview after action")
-    st.dataframe(st.session_state["df"].head(20), use_container_width=True)
+    st.dataframe(densify_sparse(st.session_state["df"].head(20)), use_container_width=True)
@@ -1,44 +1,76 @@
+import os
+
 import streamlit as st
-import pandas as pd
-import numpy as np
 
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import OneHotEncoder, StandardScaler, MinMaxScaler, RobustScaler
-from sklearn.impute import SimpleImputer
+from src.components.downloads import render_prepared_download
+from src.config import BATCH_SAMPLE_ROWS, PREPROCESS_N_JOBS
+from src.utils.export import export_csv, export_frames
+from src.utils.io import densify_sparse, get_dataframe_from_session, inspect_columns
+from src.utils.preprocessing import (
+    estimate_output,
+    fit_on_file_sample,
+    fit_transform_cached,
+    load_pipeline,
+    pipeline_bytes,
+    preprocessing_config,
+    run_preprocessor,
+    to_frame,
+    transform_file_chunks,
+)
+from src.utils.profiling import dataset_fingerprint, get_profile
+from src.utils.versioning import apply_transform
 
-from src.utils.io import get_dataframe_from_session, set_dataframe_in_session
 
+def _remember_pipeline(key, config):
+    fitted = st.session_state.setdefault("fitted_pipelines", {})
+    if key not in fitted:
+        n_num, n_cat = len(config["numeric_cols"]), len(config["categorical_cols"])
+        fitted[key] = {
+            "label": f"#{len(fitted) + 1}: {n_num} numeric + {n_cat} categorical, {config['scaler']}",
+            "config": config,
+        }
 
-def render():
-    st.subheader("08) Preprocessing")
-    st.markdown(
-        '<div class="muted">Prepare data for modeling: imputation, encoding, and scaling using pipelines.</div>',
-        unsafe_allow_html=True
-    )
-    st.markdown("")
 
-    df, meta = get_dataframe_from_session(st.session_state)
-    if df is None:
-        st.markdown('<div class="card">No dataset loaded.</div>', unsafe_allow_html=True)
-        return
+def _branch_caption(branches):
+    if branches:
+        parts = ", ".join(f"{name} {sec:.1f} s" for name, sec in branches.items())
+        st.caption(f"Branch fit times: {parts}")
+
+
+def _apply_output(X, preprocessor, config, key, meta):
+    X_df = to_frame(X, preprocessor.get_feature_names_out(), float32=config["float32"])
+
+    new_meta = dict(meta or {})
+    new_meta["preprocessing"] = dict(config, pipeline_key=key)
+
+    apply_transform(st.session_state, "Preprocessing", meta=new_meta, frame=X_df)
+
+    st.success(f"Preprocessing applied. New shape: {X_df.shape}")
+    st.markdown("### Preview of processed data")
+    st.dataframe(densify_sparse(X_df.head(20)), use_container_width=True)
+
+
+def _config_widgets(num_cols, cat_cols, prefix=""):
+    """
+    Column pickers and pipeline options; returns the config, or None when
+    no column is selected. prefix keeps the keys of a second set apart.
+    """
+    def key(name):
+        return f"{prefix}{name}" if prefix else None
 
     # -------------------------
     # Column selection
     # -------------------------
-    num_cols = df.select_dtypes(include="number").columns.tolist()
-    cat_cols = [c for c in df.columns if c not in num_cols]
-
     st.markdown("### Column selection")
     c1, c2 = st.columns(2)
     with c1:
-        sel_num = st.multiselect("Numeric columns", num_cols, default=num_cols)
+        sel_num = st.multiselect("Numeric columns", num_cols, default=num_cols, key=key("num_cols"))
     with c2:
-        sel_cat = st.multiselect("Categorical columns", cat_cols, default=cat_cols)
+        sel_cat = st.multiselect("Categorical columns", cat_cols, default=cat_cols, key=key("cat_cols"))
 
     if not sel_num and not sel_cat:
         st.warning("Select at least one column.")
-        return
+        return None
 
     # -------------------------
     # Options
@@ -47,91 +79,230 @@ def render():
 
     o1, o2, o3 = st.columns(3)
     with o1:
-        num_impute = st.selectbox("Numeric imputation", ["mean", "median", "constant"], index=0)
-        num_const = st.text_input("Numeric constant", value="0")
+        num_impute = st.selectbox("Numeric imputation", ["mean", "median", "constant"], index=0, key=key("num_impute"))
+        num_const = st.text_input("Numeric constant", value="0", key=key("num_const"))
     with o2:
-        cat_impute = st.selectbox("Categorical imputation", ["most_frequent", "constant"], index=0)
-        cat_const = st.text_input("Categorical constant", value="Unknown")
+        cat_impute = st.selectbox("Categorical imputation", ["most_frequent", "constant"], index=0, key=key("cat_impute"))
+        cat_const = st.text_input("Categorical constant", value="Unknown", key=key("cat_const"))
     with o3:
-        scaler_name = st.selectbox("Scaler", ["StandardScaler", "MinMaxScaler", "RobustScaler", "None"], index=0)
+        scaler_name = st.selectbox("Scaler", ["StandardScaler", "MinMaxScaler", "RobustScaler", "None"], index=0, key=key("scaler"))
+        cpus = os.cpu_count() or 1
+        n_jobs = st.number_input(
+            "Parallel jobs", 1, cpus, min(PREPROCESS_N_JOBS or cpus, cpus), 1,
+            help="Columns are split into this many transformer branches that run concurrently.",
+            key=key("n_jobs"),
+        )
 
-    # -------------------------
-    # Build pipelines
-    # -------------------------
-    num_steps = []
-    if sel_num:
-        num_steps.append(("imputer", SimpleImputer(strategy=num_impute if num_impute != "constant" else "constant",
-                                                    fill_value=float(num_const) if num_impute == "constant" else None)))
-        if scaler_name != "None":
-            scaler = {
-                "StandardScaler": StandardScaler(),
-                "MinMaxScaler": MinMaxScaler(),
-                "RobustScaler": RobustScaler()
-            }[scaler_name]
-            num_steps.append(("scaler", scaler))
-        num_pipe = Pipeline(steps=num_steps)
-    else:
-        num_pipe = None
-
-    cat_steps = []
-    if sel_cat:
-        cat_steps.append(("imputer", SimpleImputer(strategy=cat_impute,
-                                                    fill_value=cat_const if cat_impute == "constant" else None)))
-        cat_steps.append(("encoder", OneHotEncoder(handle_unknown="ignore", sparse_output=False)))
-        cat_pipe = Pipeline(steps=cat_steps)
-    else:
-        cat_pipe = None
+    st.markdown("### Output & memory")
+    m1, m2, m3, m4 = st.columns(4)
+    with m1:
+        sparse_output = st.checkbox("Sparse one-hot output", value=False, help="Keep encoded columns sparse (CSR) end to end.", key=key("sparse"))
+    with m2:
+        float32 = st.checkbox("float32 output", value=False, help="Half the memory of float64.", key=key("float32"))
+    with m3:
+        max_categories = st.number_input("Max categories per column (0 = no cap)", 0, None, 0, 1, key=key("max_categories"))
+    with m4:
+        min_frequency = st.number_input(
+            "Min category frequency (0 = off)", 0.0, None, 0.0, 1.0,
+            help="Count (>= 1) or share of rows (< 1). Rarer categories are grouped as infrequent.",
+            key=key("min_frequency"),
+        )
 
-    transformers = []
-    if num_pipe and sel_num:
-        transformers.append(("num", num_pipe, sel_num))
-    if cat_pipe and sel_cat:
-        transformers.append(("cat", cat_pipe, sel_cat))
+    return preprocessing_config(
+        sel_num,
+        sel_cat,
+        num_imputation=num_impute,
+        num_constant=float(num_const) if num_impute == "constant" else 0.0,
+        cat_imputation=cat_impute,
+        cat_constant=cat_const,
+        scaler=scaler_name,
+        sparse_output=sparse_output,
+        float32=float32,
+        max_categories=int(max_categories),
+        min_frequency=float(min_frequency),
+        n_jobs=int(n_jobs),
+    )
 
-    preprocessor = ColumnTransformer(transformers=transformers, remainder="drop")
+
+def _render_session(df, meta):
+    num_cols = df.select_dtypes(include="number").columns.tolist()
+    config = _config_widgets(num_cols, [c for c in df.columns if c not in num_cols])
+    if config is None:
+        return
+
+    # -------------------------
+    # Size estimate (from cached profile counts)
+    # -------------------------
+    est = estimate_output(get_profile(st.session_state), config)
+    mb = 1024 ** 2
+    limit = f" of {est['limit_bytes'] / mb:,.0f} MB allowed" if est["limit_bytes"] else ""
+    st.caption(
+        f"Estimated output: {est['rows']:,} × up to {est['columns']:,} columns, "
+        f"{est['output_bytes'] / mb:,.1f} MB ({est['peak_bytes'] / mb:,.1f} MB peak{limit})."
+    )
+    if not est["fits"]:
+        st.error(
+            "This transform would likely run out of memory. Enable sparse output, float32, "
+            "or cap categories, or select fewer columns."
+        )
 
     # -------------------------
     # Apply
     # -------------------------
     st.markdown("")
-    apply = st.button("Apply preprocessing", type="primary")
+    apply = st.button("Apply preprocessing", type="primary", disabled=not est["fits"])
 
     if apply:
         try:
-            X = preprocessor.fit_transform(df)
-            # Build feature names
-            feature_names = []
-            if sel_num:
-                feature_names.extend(sel_num)
-            if sel_cat:
-                ohe = preprocessor.named_transformers_["cat"].named_steps["encoder"]
-                cat_features = ohe.get_feature_names_out(sel_cat).tolist()
-                feature_names.extend(cat_features)
-
-            X_df = pd.DataFrame(X, columns=feature_names)
-            new_meta = dict(meta or {})
-            new_meta["preprocessing"] = {
-                "numeric_cols": sel_num,
-                "categorical_cols": sel_cat,
-                "num_imputation": num_impute,
-                "cat_imputation": cat_impute,
-                "scaler": scaler_name,
-            }
-
-            set_dataframe_in_session(X_df, new_meta, st.session_state)
-
-            st.success(f"Preprocessing applied. New shape: {X_df.shape}")
-            st.markdown("### Preview of processed data")
-            st.dataframe(X_df.head(20), use_container_width=True)
-
-            # Download
-            csv = X_df.to_csv(index=False).encode("utf-8")
-            st.download_button(
-                "Download processed CSV",
-                data=csv,
-                file_name="processed_data.csv",
-                mime="text/csv"
-            )
+            X, preprocessor, fit_info = fit_transform_cached(df, config, dataset_fingerprint(st.session_state))
+            _remember_pipeline(fit_info["key"], config)
+            _apply_output(X, preprocessor, config, fit_info["key"], meta)
+            if fit_info["reused"]:
+                st.caption(f"Reused the fitted pipeline for this configuration and dataset version (no fit, {fit_info['seconds']:.2f} s).")
+            else:
+                st.caption(f"Pipeline fitted in {fit_info['seconds']:.2f} s and saved for reuse.")
+                _branch_caption(fit_info["branches"])
 
         except Exception as e:
             st.exception(e)
+
+    # -------------------------
+    # Fitted pipelines (this session)
+    # -------------------------
+    fitted = st.session_state.get("fitted_pipelines", {})
+    usable = {
+        key: entry for key, entry in fitted.items()
+        if set(entry["config"]["numeric_cols"] + entry["config"]["categorical_cols"]) <= set(df.columns)
+    }
+    if usable:
+        st.markdown("")
+        st.markdown("### Fitted pipelines")
+        key = st.selectbox(
+            "Pipeline",
+            list(usable),
+            format_func=lambda k: usable[k]["label"],
+            help="Pipelines fitted in this session whose input columns exist in the current dataset.",
+        )
+        artifact = pipeline_bytes(key)
+        if artifact is None:
+            st.warning("This pipeline is no longer in the pipeline cache; apply its configuration again to refit it.")
+        else:
+            p1, p2 = st.columns(2)
+            with p1:
+                if st.button("Transform current dataset (no fit)", use_container_width=True):
+                    try:
+                        preprocessor = load_pipeline(key)
+                        X, _ = run_preprocessor(preprocessor, "transform", df)
+                        _apply_output(X, preprocessor, usable[key]["config"], key, meta)
+                    except Exception as e:
+                        st.exception(e)
+            with p2:
+                st.download_button(
+                    "Download fitted pipeline (.joblib)",
+                    data=artifact,
+                    file_name=f"pipeline_{key[:12]}.joblib",
+                    mime="application/octet-stream",
+                    use_container_width=True,
+                )
+            st.caption("Load with joblib.load() and call .transform() on a DataFrame with the same input columns.")
+
+
+def _render_batch():
+    # -------------------------
+    # Batch mode (source file larger than memory)
+    # -------------------------
+    st.markdown("")
+    st.markdown("### Batch mode (large files)")
+    st.caption(
+        "Fit a configuration on a random sample of a CSV/Parquet file, then stream the whole file "
+        "through the fitted pipeline chunk by chunk into a new file. The file is never loaded in full, "
+        "and no dataset needs to be loaded."
+    )
+    batch_file = st.file_uploader("Source file", type=["csv", "txt", "parquet"], key="batch_source")
+    if batch_file is None:
+        return
+
+    cached = st.session_state.get("batch_columns")
+    if cached is None or cached[0] != batch_file.file_id:
+        try:
+            cached = (batch_file.file_id, inspect_columns(batch_file))
+        except Exception as e:
+            st.error(f"Could not read the columns of this file: {e}")
+            return
+        st.session_state["batch_columns"] = cached
+    columns = cached[1]
+
+    # column pickers come from the batch file itself, so a new file starts fresh
+    config = _config_widgets(columns["numeric"], columns["categorical"], prefix=f"batch_{batch_file.file_id}_")
+    if config is not None:
+        b1, b2 = st.columns(2)
+        with b1:
+            sample_rows = st.number_input("Rows sampled for fitting", 1_000, None, BATCH_SAMPLE_ROWS, 10_000)
+        with b2:
+            batch_format = st.selectbox("Output format", ["Parquet", "CSV"], key="batch_format")
+
+        fmt = batch_format.lower()
+
+        def _build_batch(cb):
+            preprocessor, fit_info = fit_on_file_sample(batch_file, config, int(sample_rows))
+            _remember_pipeline(fit_info["key"], config)
+            f, info = export_frames(
+                transform_file_chunks(batch_file, preprocessor, config), fmt=fmt, progress_callback=cb
+            )
+            info["fit"] = fit_info
+            return f, info
+
+        info = render_prepared_download(
+            "batch_output",
+            (batch_file.file_id, str(config), int(sample_rows), fmt),
+            _build_batch,
+            label=f"Download processed {batch_format}",
+            file_name=f"processed_data.{fmt}",
+            mime="application/vnd.apache.parquet" if fmt == "parquet" else "text/csv",
+        )
+        if info is not None:
+            fit_info = info["fit"]
+            if fit_info["reused"]:
+                st.caption(f"{info['rows']:,} rows transformed with the cached pipeline for this file and sample size.")
+            else:
+                st.caption(
+                    f"Fitted on {fit_info['sample_rows']:,} sampled rows of {fit_info['total_rows']:,} "
+                    f"in {fit_info['seconds']:.2f} s; {info['rows']:,} rows transformed."
+                )
+                _branch_caption(fit_info["branches"])
+
+
+def render():
+    st.subheader("08) Preprocessing")
+    st.markdown(
+        '<div class="muted">Prepare data for modeling: imputation, encoding, and scaling using pipelines.</div>',
+        unsafe_allow_html=True
+    )
+    st.markdown("")
+
+    df, meta = get_dataframe_from_session(st.session_state)
+    if df is None:
+        st.markdown(
+            '<div class="card">No dataset loaded. Batch mode below works directly on a file.</div>',
+            unsafe_allow_html=True,
+        )
+    else:
+        _render_session(df, meta)
+
+    _render_batch()
+
+    # -------------------------
+    # Download (current dataset is a preprocessing output)
+    # -------------------------
+    out_df, out_meta = get_dataframe_from_session(st.session_state)
+    if (out_meta or {}).get("preprocessing"):
+        st.markdown("")
+        st.markdown("### Download processed data")
+        render_prepared_download(
+            "processed_csv",
+            dataset_fingerprint(st.session_state),
+            lambda cb: export_csv(out_df, progress_callback=cb),
+            label="Download processed CSV",
+            file_name="processed_data.csv",
+            mime="text/csv",
+        )
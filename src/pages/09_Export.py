@@ -1,13 +1,33 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 
-import io
 import json
-import zipfile
 from datetime import datetime
 
-from src.utils.io import get_dataframe_from_session
+from src.components.downloads import render_prepared_download
+from src.config import EXPORT_ROW_GROUP_ROWS
+from src.utils.export import (
+    ARROW_FORMATS,
+    EXCEL_MAX_ROWS,
+    ZIP_COMPRESSION,
+    ZipEntry,
+    excel_engine,
+    export_arrow,
+    export_csv,
+    export_excel,
+    export_zip,
+    write_arrow,
+    write_csv,
+)
+from src.utils.io import densify_sparse, get_dataframe_from_session
+from src.utils.profiling import DatasetProfile, dataset_fingerprint, get_profile
+
+
+COLUMNAR_EXPORTS = {
+    "Parquet (dataset)": "parquet",
+    "Feather (dataset)": "feather",
+    "Arrow IPC (dataset)": "arrow_ipc",
+}
 
 
 def _safe_json(obj):
@@ -22,24 +42,22 @@ def _safe_json(obj):
         return str(obj)
 
 
-def _build_eda_summary(df: pd.DataFrame) -> dict:
+def _build_eda_summary(profile: DatasetProfile) -> dict:
+    df = profile.df
     summary = {}
     summary["overview"] = {
         "rows": int(df.shape[0]),
         "cols": int(df.shape[1]),
-        "numeric_cols": int(df.select_dtypes(include="number").shape[1]),
-        "categorical_cols": int(df.select_dtypes(exclude="number").shape[1]),
-        "duplicates": int(df.duplicated().sum()),
+        "numeric_cols": len(profile.numeric_columns()),
+        "categorical_cols": len(profile.categorical_columns()),
+        "duplicates": profile.duplicate_rows(),
     }
 
-    miss_count = df.isna().sum()
-    miss_pct = (miss_count / len(df) * 100) if len(df) else miss_count
-    miss_tbl = pd.DataFrame({
-        "column": df.columns,
-        "missing_count": miss_count.values,
-        "missing_pct": miss_pct.values,
-        "dtype": df.dtypes.astype(str).values
-    }).sort_values("missing_count", ascending=False)
+    miss_count = profile.missing_counts()
+    miss_tbl = (
+        profile.column_summary()[["column", "missing_count", "missing_pct", "dtype"]]
+        .sort_values("missing_count", ascending=False)
+    )
 
     summary["missing"] = {
         "total_missing_cells": int(miss_count.sum()),
@@ -47,16 +65,8 @@ def _build_eda_summary(df: pd.DataFrame) -> dict:
         "missing_table_top20": miss_tbl.head(20).to_dict(orient="records"),
     }
 
-    num_df = df.select_dtypes(include="number")
-    if num_df.shape[1] >= 2:
-        corr = num_df.corr(method="pearson")
-        corr_pairs = (
-            corr.where(np.triu(np.ones(corr.shape), k=1).astype(bool))
-            .stack()
-            .reset_index()
-        )
-        corr_pairs.columns = ["feature_1", "feature_2", "correlation"]
-        top_abs = corr_pairs.reindex(corr_pairs["correlation"].abs().sort_values(ascending=False).index).head(20)
+    if len(profile.numeric_columns()) >= 2:
+        top_abs = profile.top_correlated_pairs(k=20, method="pearson")
         summary["correlation"] = {
             "method": "pearson",
             "top_abs_pairs_top20": top_abs.round(6).to_dict(orient="records"),
@@ -67,6 +77,51 @@ def _build_eda_summary(df: pd.DataFrame) -> dict:
     return summary
 
 
+def _excel_summary(profile: DatasetProfile) -> pd.DataFrame:
+    """
+    Column profile plus numeric statistics, from cached profiling results.
+    """
+    stats = profile.describe().reset_index(names="column")
+    return profile.column_summary().merge(stats, on="column", how="left")
+
+
+def _report_bytes(profile: DatasetProfile, meta, ts) -> bytes:
+    package = {
+        "meta_from_session": _safe_json(meta or {}),
+        "eda_summary": _safe_json(_build_eda_summary(profile)),
+        "generated_at": ts,
+    }
+    return json.dumps(package, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _zip_entries(df, profile, meta, ts, data_format, sep, include_index, compression, level, progress_callback):
+    """
+    Archive members: the dataset first (built in the calling thread, with
+    progress), then the report, generated concurrently.
+    """
+    data_name = f"dataset_{ts}.{data_format.lower()}"
+
+    def write_data(f):
+        if data_format == "Parquet":
+            write_arrow(df, f, fmt="parquet", index=include_index, progress_callback=progress_callback)
+        else:
+            write_csv(df, f, sep=sep, index=include_index, progress_callback=progress_callback)
+
+    def write_report(f):
+        f.write(_report_bytes(profile, meta, ts))
+
+    readme = (
+        f"Export package generated at: {ts}\n"
+        f"- {data_name}\n"
+        f"- report_{ts}.json\n"
+    ).encode("utf-8")
+    return [
+        ZipEntry(data_name, write_data, compression, level),
+        ZipEntry(f"report_{ts}.json", write_report, "deflate", 6),
+        ZipEntry("README.txt", lambda f: f.write(readme), "store"),
+    ]
+
+
 def render():
     st.subheader("09) Export")
     st.markdown(
@@ -81,6 +136,7 @@ def render():
         return
 
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    fingerprint = dataset_fingerprint(st.session_state)
 
     # -------------------------
     # User chooses what to export
@@ -88,7 +144,15 @@ def render():
     st.markdown("### Choose export type")
     export_type = st.radio(
         "What do you want to download?",
-        ["CSV (dataset)", "JSON (report)", "Excel (dataset)", "ZIP (dataset + report)"],
+        [
+            "CSV (dataset)",
+            "Parquet (dataset)",
+            "Feather (dataset)",
+            "Arrow IPC (dataset)",
+            "JSON (report)",
+            "Excel (dataset)",
+            "ZIP (dataset + report)",
+        ],
         index=0
     )
 
@@ -99,27 +163,68 @@ def render():
     # CSV
     # -------------------------
     if export_type == "CSV (dataset)":
-        sep = st.selectbox("CSV separator", [",", ";", "\t", "|"], index=0)
-        csv_bytes = df.to_csv(index=include_index, sep=sep).encode("utf-8")
+        c1, c2 = st.columns(2)
+        with c1:
+            sep = st.selectbox("CSV separator", [",", ";", "\t", "|"], index=0)
+        with c2:
+            workers = st.number_input("Formatting threads", min_value=1, max_value=16, value=1, step=1)
+        csv_options = {"sep": sep, "index": include_index, "workers": int(workers)}
 
-        st.download_button(
+        render_prepared_download(
+            "csv",
+            (fingerprint, sep, include_index),
+            lambda cb: export_csv(df, progress_callback=cb, **csv_options),
             label="Download CSV",
-            data=csv_bytes,
             file_name=f"dataset_{ts}.csv",
-            mime="text/csv"
+            mime="text/csv",
+        )
+
+    # -------------------------
+    # Columnar: Parquet / Feather / Arrow IPC
+    # -------------------------
+    elif export_type in COLUMNAR_EXPORTS:
+        fmt = COLUMNAR_EXPORTS[export_type]
+        ext, mime, codecs = ARROW_FORMATS[fmt]
+
+        c1, c2, c3 = st.columns(3)
+        with c1:
+            compression = st.selectbox("Compression", codecs, index=0)
+        with c2:
+            level = st.number_input(
+                "Compression level (0 = codec default)", min_value=0, max_value=22, value=0, step=1,
+                disabled=compression not in ("zstd", "gzip"),
+            )
+        with c3:
+            row_group_rows = st.number_input(
+                "Rows per row group" if fmt == "parquet" else "Rows per record batch",
+                min_value=1_000, value=EXPORT_ROW_GROUP_ROWS, step=50_000,
+            )
+        use_dictionary = True
+        if fmt == "parquet":
+            use_dictionary = st.checkbox("Dictionary encoding", value=True)
+
+        arrow_options = {
+            "fmt": fmt,
+            "compression": compression,
+            "compression_level": int(level) if level and compression in ("zstd", "gzip") else None,
+            "row_group_rows": int(row_group_rows),
+            "use_dictionary": use_dictionary,
+            "index": include_index,
+        }
+        render_prepared_download(
+            fmt,
+            (fingerprint, tuple(sorted(arrow_options.items()))),
+            lambda cb: export_arrow(df, progress_callback=cb, **arrow_options),
+            label=f"Download {export_type.split(' (')[0]}",
+            file_name=f"dataset_{ts}{ext}",
+            mime=mime,
         )
 
     # -------------------------
     # JSON report
     # -------------------------
     elif export_type == "JSON (report)":
-        eda_summary = _build_eda_summary(df)
-        package = {
-            "meta_from_session": _safe_json(meta or {}),
-            "eda_summary": _safe_json(eda_summary),
-            "generated_at": ts,
-        }
-        json_bytes = json.dumps(package, ensure_ascii=False, indent=2).encode("utf-8")
+        json_bytes = _report_bytes(get_profile(st.session_state), meta, ts)
 
         st.download_button(
             label="Download JSON report",
@@ -132,57 +237,66 @@ def render():
     # Excel
     # -------------------------
     elif export_type == "Excel (dataset)":
-        st.info("If Excel export fails, install openpyxl in your venv: pip install openpyxl")
-
-        try:
-            xlsx_buffer = io.BytesIO()
-            with pd.ExcelWriter(xlsx_buffer, engine="openpyxl") as writer:
-                df.to_excel(writer, index=include_index, sheet_name="data")
-
-            st.download_button(
-                label="Download Excel (.xlsx)",
-                data=xlsx_buffer.getvalue(),
-                file_name=f"dataset_{ts}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-        except Exception as e:
-            st.exception(e)
+        engine = excel_engine()
+        if engine == "openpyxl":
+            st.info("For faster Excel export, install xlsxwriter in your venv: pip install xlsxwriter")
+        st.caption(
+            f"Writer: {engine} (streaming rows). Frames over {EXCEL_MAX_ROWS - 1:,} rows "
+            "are split across sheets data, data_2, ..."
+        )
+        add_summary = st.checkbox("Add summary sheet (column profile)", value=True)
+
+        def _build_excel(cb):
+            summary = _excel_summary(get_profile(st.session_state)) if add_summary else None
+            return export_excel(df, index=include_index, summary=summary, engine=engine, progress_callback=cb)
+
+        info = render_prepared_download(
+            "xlsx",
+            (fingerprint, include_index, add_summary, engine),
+            _build_excel,
+            label="Download Excel (.xlsx)",
+            file_name=f"dataset_{ts}.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+        if info and info["sheets"] > 1:
+            st.caption(f"Dataset split across {info['sheets']} sheets.")
 
     # -------------------------
     # ZIP package
     # -------------------------
     else:  # "ZIP (dataset + report)"
-        sep = st.selectbox("CSV separator inside ZIP", [",", ";", "\t", "|"], index=0)
-
-        # Build only when showing ZIP option (not on page load for other types)
-        csv_bytes = df.to_csv(index=include_index, sep=sep).encode("utf-8")
-
-        eda_summary = _build_eda_summary(df)
-        package = {
-            "meta_from_session": _safe_json(meta or {}),
-            "eda_summary": _safe_json(eda_summary),
-            "generated_at": ts,
-        }
-        json_bytes = json.dumps(package, ensure_ascii=False, indent=2).encode("utf-8")
-
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-            zf.writestr(f"dataset_{ts}.csv", csv_bytes)
-            zf.writestr(f"report_{ts}.json", json_bytes)
-            zf.writestr(
-                "README.txt",
-                f"Export package generated at: {ts}\n"
-                f"- dataset_{ts}.csv\n"
-                f"- report_{ts}.json\n"
+        c1, c2, c3 = st.columns(3)
+        with c1:
+            data_format = st.selectbox("Dataset format inside ZIP", ["CSV", "Parquet"], index=0)
+            sep = st.selectbox("CSV separator", [",", ";", "\t", "|"], index=0, disabled=data_format != "CSV")
+        with c2:
+            # Parquet is already compressed: storing it avoids a second, useless pass
+            methods = list(ZIP_COMPRESSION)
+            default = "store" if data_format == "Parquet" else "deflate"
+            compression = st.selectbox("Dataset compression", methods, index=methods.index(default))
+        with c3:
+            level = st.slider(
+                "Compression level", 1, 9, 1,
+                help="1 is fastest. Ignored for store.",
+                disabled=compression in ("store", "lzma"),
             )
 
-        st.download_button(
+        profile = get_profile(st.session_state)
+        zip_key = (fingerprint, data_format, sep, include_index, compression, level)
+
+        # Built only on request, not on every rerun of the page
+        render_prepared_download(
+            "zip",
+            zip_key,
+            lambda cb: export_zip(_zip_entries(
+                df, profile, meta, ts, data_format, sep, include_index,
+                compression, None if compression in ("store", "lzma") else level, cb,
+            )),
             label="Download ZIP package",
-            data=zip_buffer.getvalue(),
             file_name=f"export_package_{ts}.zip",
-            mime="application/zip"
+            mime="application/zip",
         )
 
     st.markdown("")
     st.markdown("### Preview")
-    st.dataframe(df.head(20), use_container_width=True)
+    st.dataframe(densify_sparse(df.head(20)), use_container_width=True)
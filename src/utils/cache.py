@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+
+def hash_file(fileobj, block_size: int = 8 * 1024 * 1024) -> str:
+    """
+    Content hash of a file-like object, read in blocks (no full copy).
+    The stream position is restored afterwards.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    pos = fileobj.tell()
+    fileobj.seek(0)
+    while True:
+        block = fileobj.read(block_size)
+        if not block:
+            break
+        h.update(block)
+    fileobj.seek(pos)
+    return h.hexdigest()
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Stable hex key from JSON-serializable parts (options dicts, hashes, ...).
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=20).hexdigest()
+
+
+class DiskCache:
+    """
+    Directory of files keyed by hex string, with a total size limit.
+    Least recently used entries (by mtime, refreshed on every hit) are
+    evicted first.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, suffix: str = ""):
+        self.directory = Path(directory)
+        self.max_bytes = int(max_bytes)
+        self.suffix = suffix
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}{self.suffix}"
+
+    def get(self, key: str) -> Optional[Path]:
+        p = self.path(key)
+        try:
+            os.utime(p)  # mark as recently used
+        except FileNotFoundError:
+            return None
+        return p
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        p = self.get(key)
+        if p is None:
+            return None
+        try:
+            return p.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put_file(self, key: str, writer: Callable[[Path], None]) -> Path:
+        """
+        writer(tmp_path) writes the entry; it is moved into place atomically.
+        """
+        final = self.path(key)
+        # unique per writer: sessions run on threads of one process
+        fd, name = tempfile.mkstemp(prefix=f"{final.name}.", suffix=".tmp", dir=self.directory)
+        os.close(fd)
+        tmp = Path(name)
+        try:
+            writer(tmp)
+            os.replace(tmp, final)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+        self.evict()
+        return final
+
+    def put_bytes(self, key: str, data: bytes) -> Path:
+        return self.put_file(key, lambda p: p.write_bytes(data))
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> None:
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for p, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self) -> None:
+        for p, _, _ in self._entries():
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _entries(self):
+        out = []
+        for p in self.directory.glob(f"*{self.suffix}"):
+            if p.name.endswith(".tmp"):
+                continue
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            out.append((p, st.st_size, st.st_mtime))
+        return out
+
+
+class BytesLRU:
+    """
+    In-process store of byte strings keyed by hex string, with a total size
+    limit. Least recently used entries are evicted first. Thread-safe, so a
+    single instance can be shared by all sessions of the server.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = int(max_bytes)
+        self._data: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._data.get(key)
+            if data is not None:
+                self._data.move_to_end(key)
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._data[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._size -= len(evicted)
+
+    def get_or_put(self, key: str, compute: Callable[[], bytes]) -> bytes:
+        data = self.get(key)
+        if data is None:
+            data = compute()
+            self.put(key, data)
+        return data
+
+    def size_bytes(self) -> int:
+        return self._size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._size = 0
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import heapq
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config import CORR_BLOCK_COLUMNS, CORR_CHUNK_BYTES, CORR_MAX_WORKERS
+
+
+METHODS = ("pearson", "spearman", "kendall")
+
+
+def column_ranks(s: pd.Series) -> np.ndarray:
+    """
+    Average ranks of a column as float64, NaN where the value is missing.
+    Spearman is Pearson on these.
+    """
+    return s.rank(method="average").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _numeric_matrix(
+    df: pd.DataFrame,
+    columns: Sequence,
+    method: str,
+    rank_of: Optional[Callable[[object], np.ndarray]] = None,
+) -> np.ndarray:
+    """
+    Column-major float matrix of the selected columns; for Spearman each
+    column is replaced by its ranks, taken from rank_of(column) when a rank
+    cache is supplied.
+    """
+    X = np.empty((len(df), len(columns)), dtype=np.float64, order="F")
+    for j, c in enumerate(columns):
+        if method == "spearman":
+            X[:, j] = rank_of(c) if rank_of is not None else column_ranks(df[c])
+        else:
+            X[:, j] = df[c].to_numpy(dtype=np.float64, na_value=np.nan)
+    return X
+
+
+def pair_correlation(x: np.ndarray, y: np.ndarray, min_periods: int = 1) -> float:
+    """
+    Pearson between two float arrays over rows where both are present.
+    Pass rank arrays to get Spearman.
+    """
+    X = _standardize(np.column_stack([x, y]))
+    prepared = _prepare_rows(X)
+    r, _ = _pearson_from_sums(_pearson_sums(prepared, (0, 1), (1, 2)), min_periods)
+    return float(r[0, 0])
+
+
+def _blocks(n_cols: int, block: int) -> List[Tuple[int, int]]:
+    return [(i, min(i + block, n_cols)) for i in range(0, n_cols, block)]
+
+
+def _prepare_rows(X: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Zero-filled values, presence mask (as float) and squared values of a
+    row slice, built once and shared by every block pair.
+    """
+    present = ~np.isnan(X)
+    A = np.where(present, X, 0.0)
+    return A, present.astype(np.float64), A * A
+
+
+def _pearson_sums(prepared, a: Tuple[int, int], b: Tuple[int, int]) -> List[np.ndarray]:
+    """
+    Pairwise sums between column spans a and b over the rows of a prepared
+    slice: counts, sums, sums of squares and cross products, each taken
+    over rows where both columns are present. They add up across slices.
+    """
+    A, M, AA = prepared
+    (a0, a1), (b0, b1) = a, b
+    Ma, Mb = M[:, a0:a1], M[:, b0:b1]
+    return [
+        Ma.T @ Mb,
+        A[:, a0:a1].T @ Mb,
+        Ma.T @ A[:, b0:b1],
+        AA[:, a0:a1].T @ Mb,
+        Ma.T @ AA[:, b0:b1],
+        A[:, a0:a1].T @ A[:, b0:b1],
+    ]
+
+
+def _pearson_from_sums(sums: List[np.ndarray], min_periods: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    NaN-aware pairwise Pearson from _pearson_sums, using only rows where both
+    columns are present (same as DataFrame.corr). Returns (r, n_pairs).
+    """
+    n, sa, sb, saa, sbb, sab = sums
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sab - sa * sb / n
+        va = saa - sa * sa / n
+        vb = sbb - sb * sb / n
+        r = cov / np.sqrt(va * vb)
+    r[(n < max(min_periods, 2)) | (va <= 0) | (vb <= 0)] = np.nan
+    return np.clip(r, -1.0, 1.0), n.astype(np.int64)
+
+
+def _kendall_block(Xa: np.ndarray, Xb: np.ndarray, min_periods: int) -> Tuple[np.ndarray, np.ndarray]:
+    # scipy.stats is slow to import and only Kendall needs it: import on use
+    from scipy import stats as sps
+
+    r = np.full((Xa.shape[1], Xb.shape[1]), np.nan)
+    n = np.zeros_like(r, dtype=np.int64)
+    for i in range(Xa.shape[1]):
+        for j in range(Xb.shape[1]):
+            ok = ~np.isnan(Xa[:, i]) & ~np.isnan(Xb[:, j])
+            n[i, j] = int(ok.sum())
+            if n[i, j] >= max(min_periods, 2):
+                r[i, j] = sps.kendalltau(Xa[ok, i], Xb[ok, j]).statistic
+    return r, n
+
+
+def _standardize(X: np.ndarray) -> np.ndarray:
+    # the pairwise formula is shift-invariant; centering keeps the sums small.
+    # X is always a private matrix here, so it is centered in place, one
+    # column at a time (nanmean over the whole matrix copies it)
+    with np.errstate(invalid="ignore"):
+        for j in range(X.shape[1]):
+            col = X[:, j]
+            mean = np.nanmean(col) if col.size else np.nan
+            if not np.isnan(mean):
+                col -= mean
+    return X
+
+
+def _block_pairs(X: np.ndarray, method: str, min_periods: int, block: int):
+    """
+    Yields (row_slice, col_slice, r, n) for every upper-triangle block pair,
+    computed across a thread pool (NumPy matmul releases the GIL).
+
+    Pearson/Spearman accumulate the pairwise sums over row slices of about
+    CORR_CHUNK_BYTES of working set, so memory beyond X stays bounded
+    whatever the row count or worker count.
+    """
+    spans = _blocks(X.shape[1], block)
+    jobs = [(a, b) for ia, a in enumerate(spans) for b in spans[ia:]]
+    workers = CORR_MAX_WORKERS or min(32, (os.cpu_count() or 1))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        if method == "kendall":
+            def run(pair):
+                (a0, a1), (b0, b1) = pair
+                return _kendall_block(X[:, a0:a1], X[:, b0:b1], min_periods)
+
+            for ((a0, a1), (b0, b1)), (r, n) in zip(jobs, pool.map(run, jobs)):
+                yield slice(a0, a1), slice(b0, b1), r, n
+            return
+
+        # filled values, masks and squares: three float64 copies per row
+        chunk_rows = max(CORR_CHUNK_BYTES // (3 * 8 * max(X.shape[1], 1)), 1)
+        totals: List[Optional[List[np.ndarray]]] = [None] * len(jobs)
+        for start in range(0, X.shape[0], chunk_rows):
+            prepared = _prepare_rows(X[start:start + chunk_rows])
+            parts = pool.map(lambda pair: _pearson_sums(prepared, *pair), jobs)
+            for i, sums in enumerate(parts):
+                if totals[i] is None:
+                    totals[i] = sums
+                else:
+                    for acc, part in zip(totals[i], sums):
+                        acc += part
+            del prepared
+
+    for ((a0, a1), (b0, b1)), sums in zip(jobs, totals):
+        if sums is None:  # no rows
+            w, h = a1 - a0, b1 - b0
+            sums = [np.zeros((w, h)) for _ in range(6)]
+        r, n = _pearson_from_sums(sums, min_periods)
+        yield slice(a0, a1), slice(b0, b1), r, n
+
+
+def correlation_matrix(
+    df: pd.DataFrame,
+    columns: Optional[Sequence] = None,
+    method: str = "pearson",
+    min_periods: int = 1,
+    block: int = CORR_BLOCK_COLUMNS,
+    rank_of: Optional[Callable[[object], np.ndarray]] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Full correlation matrix computed in column blocks across a thread pool.
+    Returns (corr, pair_counts); pair_counts holds the number of rows where
+    both columns are present. rank_of(column) supplies cached Spearman ranks.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unsupported correlation method: {method}")
+    columns = list(df.select_dtypes(include="number").columns if columns is None else columns)
+    X = _numeric_matrix(df, columns, method, rank_of)
+    if method != "kendall":
+        X = _standardize(X)
+
+    p = len(columns)
+    R = np.full((p, p), np.nan)
+    N = np.zeros((p, p), dtype=np.int64)
+    for rs, cs, r, n in _block_pairs(X, method, min_periods, block):
+        R[rs, cs], N[rs, cs] = r, n
+        R[cs, rs], N[cs, rs] = r.T, n.T
+    idx = pd.Index(columns)
+    return pd.DataFrame(R, index=idx, columns=idx), pd.DataFrame(N, index=idx, columns=idx)
+
+
+def top_abs_pairs(
+    df: pd.DataFrame,
+    k: int = 20,
+    columns: Optional[Sequence] = None,
+    method: str = "pearson",
+    min_periods: int = 1,
+    block: int = CORR_BLOCK_COLUMNS,
+    rank_of: Optional[Callable[[object], np.ndarray]] = None,
+) -> pd.DataFrame:
+    """
+    The k most strongly correlated column pairs (by |r|), streamed block by
+    block: only one block of the matrix and a k-item heap are held at once.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unsupported correlation method: {method}")
+    columns = list(df.select_dtypes(include="number").columns if columns is None else columns)
+    X = _numeric_matrix(df, columns, method, rank_of)
+    if method != "kendall":
+        X = _standardize(X)
+
+    heap: List[Tuple[float, int, int, float, int]] = []
+    for rs, cs, r, n in _block_pairs(X, method, min_periods, block):
+        ii, jj = np.meshgrid(np.arange(rs.start, rs.stop), np.arange(cs.start, cs.stop), indexing="ij")
+        keep = (jj > ii) & ~np.isnan(r)
+        if not keep.any():
+            continue
+        vals, gi, gj, cnt = r[keep], ii[keep], jj[keep], n[keep]
+        if vals.size > k:
+            sel = np.argpartition(-np.abs(vals), k - 1)[:k]
+            vals, gi, gj, cnt = vals[sel], gi[sel], gj[sel], cnt[sel]
+        for v, i, j, c in zip(vals, gi, gj, cnt):
+            item = (abs(float(v)), int(i), int(j), float(v), int(c))
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif item[0] > heap[0][0]:
+                heapq.heapreplace(heap, item)
+
+    rows: List[Dict] = [
+        {"feature_1": columns[i], "feature_2": columns[j], "correlation": v, "n": c}
+        for _, i, j, v, c in sorted(heap, reverse=True)
+    ]
+    return pd.DataFrame(rows, columns=["feature_1", "feature_2", "correlation", "n"])
@@ -0,0 +1,498 @@
+from __future__ import annotations
+
+import shutil
+import tempfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.config import EXPORT_CHUNK_ROWS, EXPORT_ROW_GROUP_ROWS, EXPORT_SPOOL_MAX_BYTES
+from src.utils.io import densify_sparse
+
+# Columnar formats: name -> (file extension, mime type, compression codecs)
+ARROW_FORMATS = {
+    "parquet": (".parquet", "application/vnd.apache.parquet", ["zstd", "snappy", "gzip", "none"]),
+    "feather": (".feather", "application/vnd.apache.arrow.file", ["lz4", "zstd", "none"]),
+    "arrow_ipc": (".arrows", "application/vnd.apache.arrow.stream", ["zstd", "lz4", "none"]),
+}
+
+# ZIP entry compression methods (zstd needs Python 3.14+)
+ZIP_COMPRESSION = {
+    "store": zipfile.ZIP_STORED,
+    "deflate": zipfile.ZIP_DEFLATED,
+    "bzip2": zipfile.ZIP_BZIP2,
+    "lzma": zipfile.ZIP_LZMA,
+}
+if hasattr(zipfile, "ZIP_ZSTANDARD"):
+    ZIP_COMPRESSION["zstd"] = zipfile.ZIP_ZSTANDARD
+
+# .xlsx sheet limits (the header takes one row)
+EXCEL_MAX_ROWS = 1_048_576
+EXCEL_MAX_COLUMNS = 16_384
+
+
+def spooled_file():
+    """
+    Binary temp file that stays in memory up to EXPORT_SPOOL_MAX_BYTES and
+    rolls over to disk beyond that. Deleted when closed.
+    """
+    return tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_BYTES, mode="w+b")
+
+
+def _csv_chunk(df: pd.DataFrame, start: int, stop: int, header: bool, **kwargs) -> bytes:
+    return df.iloc[start:stop].to_csv(header=header, **kwargs).encode("utf-8")
+
+
+def csv_chunks(
+    df: pd.DataFrame,
+    sep: str = ",",
+    index: bool = False,
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+    workers: int = 1,
+) -> Iterator[Tuple[bytes, int]]:
+    """
+    Encoded CSV in row chunks, in order, with the rows done so far.
+    With workers > 1, chunks are formatted in a thread pool; at most
+    2 * workers chunks are in flight, so memory stays bounded.
+    """
+    kwargs = {"sep": sep, "index": index}
+    n = len(df)
+    starts = range(0, max(n, 1), chunk_rows)
+
+    if workers <= 1:
+        for start in starts:
+            stop = min(start + chunk_rows, n)
+            yield _csv_chunk(df, start, stop, start == 0, **kwargs), stop
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for start in starts:
+            stop = min(start + chunk_rows, n)
+            pending.append((pool.submit(_csv_chunk, df, start, stop, start == 0, **kwargs), stop))
+            if len(pending) >= 2 * workers:
+                fut, done = pending.popleft()
+                yield fut.result(), done
+        while pending:
+            fut, done = pending.popleft()
+            yield fut.result(), done
+
+
+def write_csv(
+    df: pd.DataFrame,
+    fileobj,
+    sep: str = ",",
+    index: bool = False,
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+    workers: int = 1,
+    progress_callback: Optional[Callable[[float, int], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Stream df as UTF-8 CSV into a binary file object, one chunk at a time.
+    Output matches df.to_csv(sep=sep, index=index).
+    progress_callback(fraction, rows_written) is called after every chunk.
+    """
+    t0 = time.perf_counter()
+    n = len(df)
+    written = 0
+    for data, done in csv_chunks(df, sep=sep, index=index, chunk_rows=int(chunk_rows), workers=int(workers)):
+        fileobj.write(data)
+        written += len(data)
+        if progress_callback is not None:
+            progress_callback(done / n if n else 1.0, done)
+    return {"bytes": written, "seconds": time.perf_counter() - t0, "rows": n}
+
+
+def _arrow_schema(df: pd.DataFrame, index: bool, chunk_rows: int) -> pa.Schema:
+    """
+    Arrow schema taken from the first converted slice. An empty slice types
+    every object column as null, so columns that are still null there are
+    typed from their first slice of non-missing values instead.
+    """
+    schema = pa.Table.from_pandas(densify_sparse(df.iloc[:chunk_rows]), preserve_index=index).schema
+    for i, field in enumerate(schema):
+        if not pa.types.is_null(field.type) or field.name not in df.columns:
+            continue
+        col = df[field.name]
+        present = col.notna().to_numpy()
+        if present.any():
+            start = int(present.argmax())
+            sample = pa.array(col.iloc[start:start + chunk_rows], from_pandas=True)
+            schema = schema.set(i, field.with_type(sample.type))
+    return schema
+
+
+def _record_batches(df: pd.DataFrame, schema: pa.Schema, index: bool, chunk_rows: int) -> Iterator[Tuple[pa.Table, int]]:
+    """
+    df converted to Arrow one row slice at a time, so only one slice is
+    ever held twice (pandas + Arrow).
+    """
+    n = len(df)
+    for start in range(0, max(n, 1), chunk_rows):
+        stop = min(start + chunk_rows, n)
+        chunk = densify_sparse(df.iloc[start:stop])
+        yield pa.Table.from_pandas(chunk, schema=schema, preserve_index=index), stop
+
+
+def write_arrow(
+    df: pd.DataFrame,
+    fileobj,
+    fmt: str = "parquet",
+    compression: str = "zstd",
+    compression_level: Optional[int] = None,
+    row_group_rows: int = EXPORT_ROW_GROUP_ROWS,
+    use_dictionary: bool = True,
+    index: bool = False,
+    progress_callback: Optional[Callable[[float, int], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Stream df into a columnar file: Parquet, Feather (Arrow IPC file) or an
+    Arrow IPC stream. Each slice of row_group_rows rows becomes one Parquet
+    row group / Arrow record batch.
+    """
+    if fmt not in ARROW_FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    t0 = time.perf_counter()
+    n = len(df)
+    codec = None if compression == "none" else compression
+    schema = _arrow_schema(df, index, int(row_group_rows))
+    sink = pa.PythonFile(fileobj, mode="w")
+
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(
+            sink, schema,
+            compression=codec or "none",
+            compression_level=compression_level,
+            use_dictionary=use_dictionary,
+        )
+    else:
+        options = pa.ipc.IpcWriteOptions(
+            compression=pa.Codec(codec, compression_level) if codec else None,
+        )
+        new_writer = pa.ipc.new_file if fmt == "feather" else pa.ipc.new_stream
+        writer = new_writer(sink, schema, options=options)
+
+    try:
+        for table, done in _record_batches(df, schema, index, int(row_group_rows)):
+            if fmt == "parquet":
+                writer.write_table(table, row_group_size=int(row_group_rows))
+            else:
+                writer.write_table(table, max_chunksize=int(row_group_rows))
+            if progress_callback is not None:
+                progress_callback(done / n if n else 1.0, done)
+    finally:
+        writer.close()
+
+    return {"bytes": fileobj.tell(), "seconds": time.perf_counter() - t0, "rows": n}
+
+
+def export_arrow(df: pd.DataFrame, **options) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Columnar export (see write_arrow) into a spooled temp file, rewound.
+    """
+    f = spooled_file()
+    try:
+        info = write_arrow(df, f, **options)
+    except Exception:
+        f.close()
+        raise
+    f.seek(0)
+    return f, info
+
+
+def export_csv(df: pd.DataFrame, **options) -> Tuple[Any, Dict[str, Any]]:
+    """
+    CSV export into a spooled temp file, rewound and ready to be served.
+    Returns (file, info); the caller owns the file and closes it.
+    """
+    f = spooled_file()
+    try:
+        info = write_csv(df, f, **options)
+    except Exception:
+        f.close()
+        raise
+    f.seek(0)
+    return f, info
+
+
+def write_frames(
+    frames: Iterable[Tuple[pd.DataFrame, float]],
+    fileobj,
+    fmt: str = "parquet",
+    compression: str = "zstd",
+    progress_callback: Optional[Callable[[float, int], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Stream a sequence of (frame, fraction done) with the same columns into
+    one CSV or Parquet file; only the current frame is held in memory.
+    Each frame becomes one Parquet row group.
+    """
+    if fmt not in ("csv", "parquet"):
+        raise ValueError(f"Unsupported format: {fmt}")
+    t0 = time.perf_counter()
+    codec = None if compression == "none" else compression
+    writer = None
+    schema = None
+    n = 0
+    try:
+        for frame, frac in frames:
+            frame = densify_sparse(frame)
+            if fmt == "csv":
+                fileobj.write(frame.to_csv(index=False, header=n == 0).encode("utf-8"))
+            else:
+                if writer is None:
+                    # typed from the first frame's values (an empty frame would
+                    # type object columns as null); later frames are cast to it.
+                    # Columns still all-missing here are assumed to be text.
+                    table = pa.Table.from_pandas(frame, preserve_index=False)
+                    schema = pa.schema(
+                        [f.with_type(pa.string()) if pa.types.is_null(f.type) else f for f in table.schema],
+                        metadata=table.schema.metadata,
+                    )
+                    table = table.cast(schema)
+                    writer = pq.ParquetWriter(pa.PythonFile(fileobj, mode="w"), schema, compression=codec or "none")
+                else:
+                    table = pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+                writer.write_table(table)
+            n += len(frame)
+            if progress_callback is not None:
+                progress_callback(frac, n)
+    finally:
+        if writer is not None:
+            writer.close()
+    return {"bytes": fileobj.tell(), "seconds": time.perf_counter() - t0, "rows": n}
+
+
+def export_frames(frames: Iterable[Tuple[pd.DataFrame, float]], **options) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Chunked export (see write_frames) into a spooled temp file, rewound.
+    """
+    f = spooled_file()
+    try:
+        info = write_frames(frames, f, **options)
+    except Exception:
+        f.close()
+        raise
+    f.seek(0)
+    return f, info
+
+
+@dataclass
+class ZipEntry:
+    """
+    One archive member. write(fileobj) produces its content; compression is
+    a ZIP_COMPRESSION name, level the codec's level (None = default).
+    """
+    name: str
+    write: Callable[[Any], Any]
+    compression: str = "deflate"
+    level: Optional[int] = None
+
+
+def _produce_entry(entry: ZipEntry):
+    f = spooled_file()
+    try:
+        entry.write(f)
+    except Exception:
+        f.close()
+        raise
+    f.seek(0)
+    return f
+
+
+def write_zip(entries: List[ZipEntry], fileobj, max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Build a ZIP archive from entries generated in parallel.
+    The first entry is produced in the calling thread (so its progress
+    callbacks can update the UI), the others in a thread pool. Each entry
+    is written once into its own spooled temp file, then streamed into the
+    archive with its own compression method, in the given order.
+    """
+    t0 = time.perf_counter()
+    rest = entries[1:]
+    files = []
+    error = None
+    with ThreadPoolExecutor(max_workers=max_workers or max(len(rest), 1)) as pool:
+        futures = [pool.submit(_produce_entry, e) for e in rest]
+        try:
+            files.append(_produce_entry(entries[0]))
+        except Exception as e:
+            error = e
+            for fut in futures:
+                fut.cancel()
+    for fut in futures:
+        if fut.cancelled():
+            continue
+        if fut.exception() is None:
+            files.append(fut.result())
+        elif error is None:
+            error = fut.exception()
+
+    sizes = {}
+    try:
+        if error is not None:
+            raise error
+        with zipfile.ZipFile(fileobj, "w", allowZip64=True) as zf:
+            for entry, src in zip(entries, files):
+                zf.compression = ZIP_COMPRESSION[entry.compression]
+                zf.compresslevel = entry.level
+                with zf.open(entry.name, "w", force_zip64=True) as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+                member = zf.getinfo(entry.name)
+                sizes[entry.name] = {"bytes": member.file_size, "compressed": member.compress_size}
+    finally:
+        for f in files:
+            f.close()
+
+    return {"bytes": fileobj.tell(), "seconds": time.perf_counter() - t0, "entries": sizes}
+
+
+def export_zip(entries: List[ZipEntry], max_workers: Optional[int] = None) -> Tuple[Any, Dict[str, Any]]:
+    """
+    ZIP package (see write_zip) into a spooled temp file, rewound.
+    """
+    f = spooled_file()
+    try:
+        info = write_zip(entries, f, max_workers=max_workers)
+    except Exception:
+        f.close()
+        raise
+    f.seek(0)
+    return f, info
+
+
+def excel_engine() -> str:
+    """
+    xlsxwriter (constant-memory mode) when installed, else openpyxl
+    (write-only mode). Both stream rows to disk instead of keeping a Python
+    object per cell.
+    """
+    try:
+        import xlsxwriter  # noqa: F401
+        return "xlsxwriter"
+    except ImportError:
+        return "openpyxl"
+
+
+def _excel_rows(frame: pd.DataFrame) -> List[list]:
+    # Plain Python values; missing values become empty cells and ±inf the
+    # strings "inf" / "-inf" (pandas' to_excel inf_rep; xlsxwriter rejects inf)
+    frame = frame.astype(object).where(frame.notna(), None)
+    frame = frame.replace({np.inf: "inf", -np.inf: "-inf"})
+    return frame.to_numpy(dtype=object).tolist()
+
+
+def _excel_ready(frame: pd.DataFrame) -> pd.DataFrame:
+    # Excel has no time zones
+    tz_cols = [c for c in frame.columns if isinstance(frame[c].dtype, pd.DatetimeTZDtype)]
+    if tz_cols:
+        frame = frame.assign(**{str(c): frame[c].dt.tz_localize(None) for c in tz_cols})
+    return frame
+
+
+class _XlsxWriterBook:
+    def __init__(self, fileobj):
+        import xlsxwriter
+
+        self.book = xlsxwriter.Workbook(fileobj, {
+            "constant_memory": True,
+            "in_memory": False,
+            "default_date_format": "yyyy-mm-dd hh:mm:ss",
+        })
+
+    def add_sheet(self, name: str):
+        ws = self.book.add_worksheet(name)
+        row = iter(range(EXCEL_MAX_ROWS))
+        return lambda values: ws.write_row(next(row), 0, values)
+
+    def close(self):
+        self.book.close()
+
+
+class _OpenpyxlBook:
+    def __init__(self, fileobj):
+        from openpyxl import Workbook
+
+        self.fileobj = fileobj
+        self.book = Workbook(write_only=True)
+
+    def add_sheet(self, name: str):
+        return self.book.create_sheet(name).append
+
+    def close(self):
+        self.book.save(self.fileobj)
+
+
+def write_excel(
+    df: pd.DataFrame,
+    fileobj,
+    index: bool = False,
+    summary: Optional[pd.DataFrame] = None,
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+    engine: Optional[str] = None,
+    progress_callback: Optional[Callable[[float, int], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Stream df into an .xlsx workbook, row chunk by row chunk, with a
+    streaming writer (see excel_engine). Frames longer than one sheet are
+    split across sheets "data", "data_2", ... An optional summary frame is
+    written to a last "summary" sheet.
+    """
+    t0 = time.perf_counter()
+    engine = engine or excel_engine()
+    n = len(df)
+    header = [str(c) for c in (df.head(0).reset_index() if index else df).columns]
+    if len(header) > EXCEL_MAX_COLUMNS:
+        raise ValueError(f"Excel sheets hold at most {EXCEL_MAX_COLUMNS:,} columns; this frame has {len(header):,}.")
+
+    book = _XlsxWriterBook(fileobj) if engine == "xlsxwriter" else _OpenpyxlBook(fileobj)
+    sheet_rows = EXCEL_MAX_ROWS - 1
+    n_sheets = max(1, -(-n // sheet_rows))
+    chunk_rows = min(int(chunk_rows), sheet_rows)
+
+    for k in range(n_sheets):
+        append = book.add_sheet("data" if k == 0 else f"data_{k + 1}")
+        append(header)
+        first, last = k * sheet_rows, min((k + 1) * sheet_rows, n)
+        for start in range(first, last, chunk_rows):
+            stop = min(start + chunk_rows, last)
+            chunk = df.iloc[start:stop]
+            if index:
+                chunk = chunk.reset_index()
+            for row in _excel_rows(_excel_ready(chunk)):
+                append(row)
+            if progress_callback is not None:
+                progress_callback(stop / n, stop)
+
+    if summary is not None:
+        append = book.add_sheet("summary")
+        append([str(c) for c in summary.columns])
+        for row in _excel_rows(summary):
+            append(row)
+
+    book.close()
+    if progress_callback is not None:
+        progress_callback(1.0, n)
+    return {"bytes": fileobj.tell(), "seconds": time.perf_counter() - t0, "rows": n, "sheets": n_sheets, "engine": engine}
+
+
+def export_excel(df: pd.DataFrame, **options) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Excel export (see write_excel) into a spooled temp file, rewound.
+    """
+    f = spooled_file()
+    try:
+        info = write_excel(df, f, **options)
+    except Exception:
+        f.close()
+        raise
+    f.seek(0)
+    return f, info
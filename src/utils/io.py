@@ -1,29 +1,493 @@
 from __future__ import annotations
 
+import codecs
+import json
+import time
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
 import chardet
-from io import BytesIO
-from typing import Tuple, Optional, Dict, Any
+from typing import Tuple, Optional, Dict, Any, Callable, Iterator, List
+
+from src.config import (
+    STREAM_CHUNK_ROWS,
+    COMPACT_CATEGORY_MAX_RATIO,
+    CACHE_DIR,
+    DATASET_CACHE_MAX_BYTES,
+    ENCODING_SAMPLE_BYTES,
+    ENCODING_DETECT_BUDGET_S,
+    EXCEL_STREAM_MAX_ROWS,
+)
+from src.utils.cache import DiskCache, hash_file, make_key
+from src.utils.versioning import start_history
+
 
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
 
-def _detect_encoding(file_bytes: bytes) -> str:
+
+def _sample_blocks(fileobj, size: Optional[int]) -> List[bytes]:
     """
-    Best-effort encoding detection for CSV bytes.
-    Defaults to utf-8 if detection is uncertain.
+    Head, middle and tail blocks of the file (each ENCODING_SAMPLE_BYTES).
     """
+    n = ENCODING_SAMPLE_BYTES
+    offsets = [0]
+    if size and size > 2 * n:
+        offsets += [size // 2, size - n]
+    blocks = []
+    for off in offsets:
+        fileobj.seek(off)
+        blocks.append(fileobj.read(n))
+    fileobj.seek(0)
+    return blocks
+
+
+def _is_utf8(block: bytes, mid_stream: bool) -> bool:
+    if mid_stream:
+        # a block cut from the middle may start inside a multi-byte sequence
+        i = 0
+        while i < 3 and i < len(block) and 0x80 <= block[i] <= 0xBF:
+            i += 1
+        block = block[i:]
+    try:
+        # final=False tolerates a sequence truncated at the end of the block
+        codecs.getincrementaldecoder("utf-8")("strict").decode(block, final=False)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def _detect_encoding(fileobj) -> Tuple[str, Dict[str, Any]]:
+    """
+    Tiered encoding detection for CSV files:
+    BOM -> strict UTF-8 check of sampled blocks -> chardet on the head block
+    (time-bounded) -> latin-1.
+    Returns (encoding, info) with the method used and the time taken.
+    """
+    t0 = time.perf_counter()
+    blocks = _sample_blocks(fileobj, _file_size(fileobj))
+    head = blocks[0]
+
+    enc, method = None, None
+    for bom, name in _BOMS:
+        if head.startswith(bom):
+            enc, method = name, "bom"
+            break
+
+    if enc is None and all(_is_utf8(b, i > 0) for i, b in enumerate(blocks)):
+        enc, method = "utf-8", "utf8-sample"
+
+    if enc is None:
+        detector = chardet.UniversalDetector()
+        step = 16 * 1024
+        for i in range(0, len(head), step):
+            detector.feed(head[i:i + step])
+            if detector.done or time.perf_counter() - t0 > ENCODING_DETECT_BUDGET_S:
+                break
+        result = detector.close()
+        if result.get("encoding"):
+            enc, method = result["encoding"].lower(), "chardet"
+
+    if enc is None:
+        enc, method = "latin-1", "fallback"
+
+    info = {"method": method, "ms": round((time.perf_counter() - t0) * 1000, 2)}
+    return enc, info
+
+
+def _file_size(uploaded_file) -> Optional[int]:
+    size = getattr(uploaded_file, "size", None)
+    if size is not None:
+        return int(size)
     try:
-        result = chardet.detect(file_bytes[:200_000])  # sample first 200KB
-        enc = (result.get("encoding") or "utf-8").lower()
-        return enc
+        pos = uploaded_file.tell()
+        uploaded_file.seek(0, 2)
+        size = uploaded_file.tell()
+        uploaded_file.seek(pos)
+        return int(size)
     except Exception:
-        return "utf-8"
+        return None
+
+
+def _reader_exhausted(reader) -> bool:
+    # the C parser reads ahead, so tell() cannot say whether rows are left
+    try:
+        reader.get_chunk(1)
+    except StopIteration:
+        return True
+    return False
+
+
+def _assemble_columns(parts: Dict[str, List[pd.Series]], columns: List[str]) -> pd.DataFrame:
+    """
+    Build the final frame one column at a time, releasing each column's
+    chunk pieces as soon as they are concatenated (the pieces own their
+    data, see _read_csv_streaming).
+    """
+    data = {}
+    for col in columns:
+        pieces = parts.pop(col)
+        data[col] = pd.concat(pieces, ignore_index=True) if len(pieces) > 1 else pieces[0].reset_index(drop=True)
+        del pieces
+    # copy=False keeps one block per column instead of consolidating (a full copy)
+    return pd.DataFrame(data, columns=columns, copy=False)
+
+
+def _read_csv_streaming(
+    uploaded_file,
+    encoding: str,
+    chunk_rows: int,
+    max_rows: Optional[int],
+    max_bytes: Optional[int],
+    progress_callback: Optional[Callable[[float, int], None]],
+    columns: Optional[List[str]] = None,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Parse a CSV file object chunk by chunk, without copying the raw bytes.
+    Stops early once the row or byte budget is reached.
+    """
+    total_bytes = _file_size(uploaded_file)
+    uploaded_file.seek(0)
+
+    parts: Dict[str, List[pd.Series]] = {}
+    names: List[str] = []
+    n_rows = 0
+    n_chunks = 0
+    truncated = False
+
+    reader = pd.read_csv(
+        uploaded_file, encoding=encoding, encoding_errors="replace", usecols=columns, chunksize=chunk_rows
+    )
+    with reader:
+        for chunk in reader:
+            if max_rows is not None and n_rows + len(chunk) > max_rows:
+                chunk = chunk.iloc[: max_rows - n_rows]
+                truncated = True
+
+            if not names:
+                names = chunk.columns.tolist()
+                parts = {col: [] for col in names}
+            # copy each column out of the chunk's 2-D block: a view would
+            # keep the whole block alive until every column is assembled
+            for col in names:
+                parts[col].append(chunk[col].copy())
+
+            n_rows += len(chunk)
+            n_chunks += 1
+            del chunk
+
+            pos = uploaded_file.tell()
+            if progress_callback is not None:
+                frac = min(pos / total_bytes, 1.0) if total_bytes else 0.0
+                progress_callback(frac, n_rows)
+
+            if truncated or (max_rows is not None and n_rows >= max_rows) or (
+                max_bytes is not None and pos >= max_bytes
+            ):
+                truncated = truncated or not _reader_exhausted(reader)
+                break
+
+    if progress_callback is not None:
+        progress_callback(1.0, n_rows)
+
+    df = _assemble_columns(parts, names) if names else pd.DataFrame()
+    info = {
+        "chunk_rows": chunk_rows,
+        "chunks": n_chunks,
+        "bytes_read": uploaded_file.tell(),
+        "total_bytes": total_bytes,
+        "truncated": truncated,
+    }
+    return df, info
+
+
+def iter_file_chunks(
+    uploaded_file,
+    chunk_rows: int = STREAM_CHUNK_ROWS,
+    columns: Optional[List[str]] = None,
+    dtype: Optional[Dict[str, Any]] = None,
+) -> Iterator[Tuple[pd.DataFrame, float]]:
+    """
+    Yield (chunk, fraction of the file consumed) for a CSV or Parquet file,
+    never holding more than one chunk. Used for out-of-core passes over
+    files that do not fit in memory. dtype applies to CSV only (Parquet
+    columns are already typed).
+    """
+    suffix = uploaded_file.name.split(".")[-1].lower()
+
+    if suffix in ("csv", "txt"):
+        enc, _ = _detect_encoding(uploaded_file)
+        total_bytes = _file_size(uploaded_file)
+        uploaded_file.seek(0)
+        reader = pd.read_csv(
+            uploaded_file, encoding=enc, encoding_errors="replace", usecols=columns, dtype=dtype,
+            chunksize=chunk_rows,
+        )
+        with reader:
+            for chunk in reader:
+                pos = uploaded_file.tell()
+                yield chunk, min(pos / total_bytes, 1.0) if total_bytes else 0.0
+
+    elif suffix == "parquet":
+        uploaded_file.seek(0)
+        pf = pq.ParquetFile(uploaded_file)
+        total_rows = pf.metadata.num_rows
+        n_rows = 0
+        for batch in pf.iter_batches(batch_size=chunk_rows, columns=columns):
+            n_rows += batch.num_rows
+            yield batch.to_pandas(), n_rows / total_rows if total_rows else 1.0
+
+    else:
+        raise ValueError("Chunked reading supports CSV and Parquet files.")
+
+
+def _arrow_string_dtype():
+    """
+    Arrow-backed string dtype with NaN as missing marker, so downstream
+    numpy/sklearn code keeps working (pd.NA breaks SimpleImputer).
+    """
+    try:
+        return pd.StringDtype("pyarrow", na_value=np.nan)  # pandas >= 2.3
+    except TypeError:
+        return pd.StringDtype("pyarrow_numpy")  # pandas 2.1 / 2.2
+
+
+def _compact_series(s: pd.Series) -> pd.Series:
+    if pd.api.types.is_bool_dtype(s) or isinstance(s.dtype, pd.CategoricalDtype):
+        return s
+
+    if pd.api.types.is_integer_dtype(s):
+        kind = "unsigned" if s.notna().any() and s.min() >= 0 else "integer"
+        return pd.to_numeric(s, downcast=kind)
+
+    if pd.api.types.is_float_dtype(s):
+        if s.dtype == np.float32:
+            return s
+        small = s.astype(np.float32)
+        # only downcast when every value survives the round trip
+        if np.array_equal(small.to_numpy(dtype=np.float64), s.to_numpy(dtype=np.float64), equal_nan=True):
+            return small
+        return s
+
+    if pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s):
+        if pd.api.types.infer_dtype(s, skipna=True) not in ("string", "empty"):
+            return s  # mixed objects: leave untouched
+        n_unique = s.nunique(dropna=True)
+        if len(s) and n_unique / len(s) <= COMPACT_CATEGORY_MAX_RATIO:
+            return s.astype("category")
+        return s.astype(_arrow_string_dtype())
+
+    return s
+
+
+def densify_sparse(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sparse columns (e.g. sparse one-hot output) converted to their dense
+    dtype, for consumers that do not accept them (Arrow, st.dataframe).
+    Meant for previews and row slices, not whole large frames.
+    """
+    sparse_cols = {c: df[c].dtype.subtype for c in df.columns if isinstance(df[c].dtype, pd.SparseDtype)}
+    return df.astype(sparse_cols) if sparse_cols else df
+
+
+def compact_dataframe(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Downcast numeric columns to the smallest lossless width, turn
+    low-cardinality text into `category` and the remaining text into
+    Arrow-backed strings.
+    Returns (compact_df, info) with before/after memory in bytes.
+    """
+    before = int(df.memory_usage(deep=True).sum())
+    converted: Dict[str, str] = {}
+    data = {}
+    for col in df.columns:
+        new = _compact_series(df[col])
+        if str(new.dtype) != str(df[col].dtype):
+            converted[str(col)] = f"{df[col].dtype} -> {new.dtype}"
+        data[col] = new
+
+    out = pd.DataFrame(data, index=df.index, columns=df.columns)
+    after = int(out.memory_usage(deep=True).sum())
+    info = {
+        "memory_before_bytes": before,
+        "memory_after_bytes": after,
+        "converted": converted,
+    }
+    return out, info
+
+
+def _count_replacements(df: pd.DataFrame) -> int:
+    """
+    U+FFFD characters in the headers and text columns: the bytes the
+    single-pass decode could not map and replaced.
+    """
+    n = sum(str(c).count("\ufffd") for c in df.columns)
+    for col in df.columns:
+        s = df[col]
+        if pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s):
+            n += int(s.str.count("\ufffd").sum())
+    return n
+
+
+def _arrow_to_pandas(table: pa.Table, arrow_dtypes: bool) -> pd.DataFrame:
+    if arrow_dtypes:
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    return table.to_pandas()
+
+
+def _read_csv_pyarrow(uploaded_file, encoding: str, columns: Optional[List[str]], arrow_dtypes: bool) -> pd.DataFrame:
+    """
+    Multi-threaded CSV parse through Arrow.
+    """
+    if encoding in ("utf-8", "utf8", "ascii"):
+        encoding = "utf8"  # Arrow's native path, no Python transcoding
+
+    uploaded_file.seek(0)
+    table = pacsv.read_csv(
+        uploaded_file,
+        read_options=pacsv.ReadOptions(encoding=encoding, use_threads=True),
+        convert_options=pacsv.ConvertOptions(include_columns=columns) if columns else None,
+    )
+    df = _arrow_to_pandas(table, arrow_dtypes)
+
+    # Arrow types text with invalid UTF-8 as binary: decode with replacement,
+    # matching encoding_errors="replace" on the pandas path
+    for field in table.schema:
+        if pa.types.is_binary(field.type) or pa.types.is_large_binary(field.type):
+            df[field.name] = df[field.name].astype(object).str.decode("utf-8", errors="replace")
+    return df
+
+
+def inspect_parquet(uploaded_file) -> Dict[str, Any]:
+    """
+    Read only the Parquet footer: column names, row groups and row count.
+    """
+    uploaded_file.seek(0)
+    pf = pq.ParquetFile(uploaded_file)
+    info = {
+        "columns": pf.schema_arrow.names,
+        "num_row_groups": pf.num_row_groups,
+        "num_rows": pf.metadata.num_rows,
+    }
+    uploaded_file.seek(0)
+    return info
+
+
+def inspect_columns(uploaded_file, sample_rows: int = 1000) -> Dict[str, List[str]]:
+    """
+    Numeric and other column names of a CSV or Parquet file, without
+    loading it: the Parquet schema, or dtypes inferred from the first
+    sample_rows rows of a CSV.
+    """
+    suffix = uploaded_file.name.split(".")[-1].lower()
+
+    if suffix in ("csv", "txt"):
+        enc, _ = _detect_encoding(uploaded_file)
+        uploaded_file.seek(0)
+        head = pd.read_csv(uploaded_file, encoding=enc, encoding_errors="replace", nrows=sample_rows)
+        columns = head.columns.tolist()
+        numeric = head.select_dtypes(include="number").columns.tolist()
+
+    elif suffix == "parquet":
+        uploaded_file.seek(0)
+        schema = pq.ParquetFile(uploaded_file).schema_arrow
+        columns = schema.names
+        numeric = [f.name for f in schema if pa.types.is_integer(f.type) or pa.types.is_floating(f.type)]
+
+    else:
+        raise ValueError("Column inspection supports CSV and Parquet files.")
+
+    uploaded_file.seek(0)
+    return {"numeric": numeric, "categorical": [c for c in columns if c not in numeric]}
+
+
+def _excel_engine(suffix: str, rows_needed: Optional[int] = None) -> Optional[str]:
+    """
+    Fastest available reader. openpyxl streams rows and stops early, so it
+    wins for short .xlsx row ranges; calamine (Rust, whole sheet) wins for
+    everything else when python-calamine is installed and pandas supports
+    it. None means pandas' default for the format.
+    """
+    if suffix == "xlsx" and rows_needed is not None and rows_needed <= EXCEL_STREAM_MAX_ROWS:
+        return "openpyxl"
+    try:
+        import python_calamine  # noqa: F401
+    except ImportError:
+        return None
+    major, minor = (int(p) for p in pd.__version__.split(".")[:2])
+    return "calamine" if (major, minor) >= (2, 2) else None
 
 
-def load_dataset(uploaded_file) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+def inspect_excel(uploaded_file) -> Dict[str, Any]:
+    """
+    Sheet names with their header row and declared row count, without
+    parsing the data cells (.xlsx is opened in openpyxl read-only mode).
+    """
+    suffix = uploaded_file.name.split(".")[-1].lower()
+    uploaded_file.seek(0)
+    xls = pd.ExcelFile(uploaded_file, engine="openpyxl" if suffix == "xlsx" else _excel_engine(suffix))
+    sheets = []
+    for name in xls.sheet_names:
+        rows = None
+        if suffix == "xlsx":
+            max_row = xls.book[name].max_row  # from the sheet's <dimension>, may be missing
+            rows = max_row - 1 if max_row else None
+        sheets.append({
+            "name": name,
+            "columns": xls.parse(name, nrows=0).columns.tolist(),
+            "rows": rows,
+        })
+    xls.close()
+    uploaded_file.seek(0)
+    return {"sheets": sheets, "engine": _excel_engine(suffix) or "default"}
+
+
+def load_dataset(
+    uploaded_file,
+    streaming: bool = False,
+    chunk_rows: int = STREAM_CHUNK_ROWS,
+    max_rows: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    progress_callback: Optional[Callable[[float, int], None]] = None,
+    compact: bool = False,
+    engine: str = "pandas",
+    arrow_dtypes: bool = False,
+    columns: Optional[List[str]] = None,
+    row_groups: Optional[List[int]] = None,
+    sheet: Optional[str] = None,
+    skip_rows: int = 0,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
     """
     Load dataset from Streamlit uploaded_file (CSV / Excel / Parquet).
     Returns (df, meta)
+
+    streaming=True reads CSV in chunks of chunk_rows straight from the file
+    object, honours the max_rows / max_bytes budget and reports progress as
+    progress_callback(fraction, rows_read).
+
+    compact=True runs compact_dataframe() on the result and stores the
+    before/after memory in meta["compact"].
+
+    engine="pyarrow" parses CSV with Arrow's multi-threaded reader and reads
+    Parquet through pyarrow; arrow_dtypes=True keeps Arrow-backed columns.
+    columns / row_groups restrict what is read (row_groups: Parquet only).
+    Streaming CSV reads always use the pandas chunk reader.
+
+    Excel: sheet picks the sheet (default: first); skip_rows data rows are
+    skipped after the header and at most max_rows are read.
     """
+    if engine not in ("pandas", "pyarrow"):
+        raise ValueError(f"Unsupported engine: {engine}")
+
     name = uploaded_file.name
     suffix = name.split(".")[-1].lower()
 
@@ -33,39 +497,130 @@ def load_dataset(uploaded_file) -> Tuple[pd.DataFrame, Dict[str, Any]]:
         "encoding": None,
         "rows": None,
         "cols": None,
+        "engine": engine,
     }
+    t0 = time.perf_counter()
 
     if suffix in ("csv", "txt"):
-        raw = uploaded_file.getvalue()
-        enc = _detect_encoding(raw)
+        enc, meta["encoding_detection"] = _detect_encoding(uploaded_file)
         meta["encoding"] = enc
+        # single parse pass: undecodable bytes are replaced instead of re-reading
+        # the whole file with another encoding
+        uploaded_file.seek(0)
 
-        try:
-            df = pd.read_csv(BytesIO(raw), encoding=enc, low_memory=False)
-        except UnicodeDecodeError:
-            df = pd.read_csv(BytesIO(raw), encoding="utf-8", low_memory=False)
-        except Exception:
-            df = pd.read_csv(BytesIO(raw), encoding="latin-1", low_memory=False)
+        if streaming:
+            df, meta["streaming"] = _read_csv_streaming(
+                uploaded_file, enc, chunk_rows, max_rows, max_bytes, progress_callback, columns
+            )
+        elif engine == "pyarrow":
+            df = _read_csv_pyarrow(uploaded_file, enc, columns, arrow_dtypes)
+        else:
+            df = pd.read_csv(uploaded_file, encoding=enc, encoding_errors="replace", usecols=columns, low_memory=False)
+        meta["encoding_detection"]["replaced_chars"] = _count_replacements(df)
 
     elif suffix in ("xlsx", "xls"):
-        xls = pd.ExcelFile(uploaded_file)
-        sheet = xls.sheet_names[0]
+        uploaded_file.seek(0)
+        xl_engine = _excel_engine(suffix, skip_rows + max_rows if max_rows else None)
+        with pd.ExcelFile(uploaded_file, engine=xl_engine) as xls:
+            sheet = sheet if sheet is not None else xls.sheet_names[0]
+            df = xls.parse(
+                sheet,
+                usecols=columns,
+                skiprows=range(1, skip_rows + 1) if skip_rows else None,
+                nrows=max_rows,
+            )
         meta["sheet"] = sheet
-        df = pd.read_excel(xls, sheet_name=sheet)
+        meta["excel_engine"] = xl_engine or "default"
 
     elif suffix == "parquet":
-        df = pd.read_parquet(uploaded_file)
+        if engine == "pyarrow" or row_groups is not None:
+            uploaded_file.seek(0)
+            pf = pq.ParquetFile(uploaded_file)
+            if row_groups is None:
+                table = pf.read(columns=columns, use_threads=True)
+            else:
+                table = pf.read_row_groups(row_groups, columns=columns, use_threads=True)
+                meta["row_groups"] = list(row_groups)
+            df = _arrow_to_pandas(table, arrow_dtypes)
+        else:
+            df = pd.read_parquet(uploaded_file, columns=columns)
 
     else:
         raise ValueError(f"Unsupported file type: .{suffix}")
 
+    meta["read_seconds"] = round(time.perf_counter() - t0, 4)
+
+    if compact:
+        df, meta["compact"] = compact_dataframe(df)
+
     meta["rows"], meta["cols"] = df.shape
     return df, meta
 
 
+_META_KEY = b"das_meta"
+_dataset_cache: Optional[DiskCache] = None
+
+
+def get_dataset_cache() -> DiskCache:
+    global _dataset_cache
+    if _dataset_cache is None:
+        _dataset_cache = DiskCache(CACHE_DIR / "datasets", DATASET_CACHE_MAX_BYTES, suffix=".feather")
+    return _dataset_cache
+
+
+def _write_cached_frame(path, df: pd.DataFrame, meta: Dict[str, Any]) -> None:
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    schema_meta = dict(table.schema.metadata or {})
+    schema_meta[_META_KEY] = json.dumps(meta, default=str).encode("utf-8")
+    feather.write_feather(table.replace_schema_metadata(schema_meta), str(path), compression="lz4")
+
+
+def load_dataset_cached(uploaded_file, **options) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    load_dataset() behind the on-disk dataset cache.
+    The key is the upload's content hash plus every load option, so the same
+    file loaded with the same options is parsed once and then read back from
+    Feather. Cache failures never block loading.
+    """
+    t0 = time.perf_counter()
+    cache = get_dataset_cache()
+    key_options = {k: v for k, v in options.items() if k != "progress_callback"}
+    suffix = uploaded_file.name.split(".")[-1].lower()
+    key = make_key(hash_file(uploaded_file), suffix, key_options)
+
+    path = cache.get(key)
+    if path is not None:
+        try:
+            table = feather.read_table(str(path))
+            meta = json.loads(table.schema.metadata[_META_KEY])
+            arrow_dtypes = key_options.get("arrow_dtypes", False)
+            df = _arrow_to_pandas(table, arrow_dtypes)
+            meta["file_name"] = uploaded_file.name
+            meta["cache"] = {"hit": True, "key": key[:12], "seconds": round(time.perf_counter() - t0, 4)}
+            return df, meta
+        except Exception:
+            pass  # unreadable entry: fall through and re-parse
+
+    df, meta = load_dataset(uploaded_file, **options)
+    meta["cache"] = {"hit": False, "key": key[:12]}
+    try:
+        cache.put_file(key, lambda p: _write_cached_frame(p, df, meta))
+    except Exception:
+        meta["cache"]["error"] = "could not store entry"
+    return df, meta
+
+
 def set_dataframe_in_session(df: pd.DataFrame, meta: Dict[str, Any], session_state) -> None:
-    session_state["df"] = df
-    session_state["df_meta"] = meta
+    """
+    Make df the session dataset and start a fresh version history for it.
+    Transforms on the session dataset go through versioning.apply_transform().
+    """
+    start_history(df, meta, session_state)
+
+
+def clear_dataframe_in_session(session_state) -> None:
+    for key in ("df", "df_meta", "df_fingerprint", "dataset_store"):
+        session_state.pop(key, None)
 
 
 def get_dataframe_from_session(session_state) -> Tuple[Optional[pd.DataFrame], Optional[Dict[str, Any]]]:
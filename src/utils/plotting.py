@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import io
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from matplotlib.colors import LogNorm
+import plotly.graph_objects as go
+from scipy.signal import fftconvolve
+
+from src.config import FIGURE_CACHE_MAX_BYTES, FIGURE_DPI, KDE_GRID_BINS
+from src.utils.cache import BytesLRU, make_key
+
+
+_figure_cache: Optional[BytesLRU] = None
+
+
+# =========================
+# Rendered figure cache
+# =========================
+def get_figure_cache() -> BytesLRU:
+    global _figure_cache
+    if _figure_cache is None:
+        _figure_cache = BytesLRU(FIGURE_CACHE_MAX_BYTES)
+    return _figure_cache
+
+
+def figure_png(fig) -> bytes:
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=FIGURE_DPI, bbox_inches="tight")
+    plt.close(fig)
+    return buf.getvalue()
+
+
+def cached_figure(fingerprint: Optional[str], chart: str, params: Any, build: Callable[[], Any]) -> bytes:
+    """
+    PNG bytes of a Matplotlib chart, keyed on (dataset version, chart type,
+    parameters). build() returns the figure and only runs on a cache miss.
+    """
+    key = make_key(fingerprint, chart, params)
+    return get_figure_cache().get_or_put(key, lambda: figure_png(build()))
+
+
+# =========================
+# Aggregation (NumPy, full column)
+# =========================
+def finite_values(s: pd.Series) -> np.ndarray:
+    x = s.to_numpy(dtype=np.float64, na_value=np.nan)
+    return x[np.isfinite(x)]
+
+
+def histogram_data(values: np.ndarray, bins: int = 40) -> Dict[str, np.ndarray]:
+    """
+    Exact bin edges and counts over all values.
+    """
+    counts, edges = np.histogram(values, bins=bins)
+    return {"edges": edges, "counts": counts}
+
+
+def kde_curve(values: np.ndarray, grid_bins: int = KDE_GRID_BINS) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Binned Gaussian KDE (Scott's bandwidth): histogram on a fine grid
+    convolved with the kernel, so the cost is one pass plus an FFT instead
+    of n x grid kernel evaluations. Returns None for constant columns.
+    """
+    n = values.size
+    std = values.std(ddof=1) if n > 1 else 0.0
+    if n < 2 or not std > 0:
+        return None
+    bw = std * n ** (-1 / 5)
+    lo, hi = values.min() - 3 * bw, values.max() + 3 * bw
+    counts, edges = np.histogram(values, bins=grid_bins, range=(lo, hi))
+    dx = edges[1] - edges[0]
+
+    half = int(min(np.ceil(4 * bw / dx), grid_bins))
+    offsets = np.arange(-half, half + 1) * dx
+    kernel = np.exp(-0.5 * (offsets / bw) ** 2)
+    kernel /= kernel.sum()
+
+    density = np.clip(fftconvolve(counts, kernel, mode="same"), 0, None) / (n * dx)
+    return {"x": (edges[:-1] + edges[1:]) / 2, "density": density}
+
+
+def box_stats(values: np.ndarray, q1: float, median: float, q3: float) -> Dict[str, Any]:
+    """
+    Box statistics in matplotlib's bxp() layout. Quartiles come from the
+    caller (exact or sketched); whiskers and the outlier count need one
+    vectorized pass over the values.
+    """
+    iqr = q3 - q1
+    lo_fence, hi_fence = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+    inside = values[(values >= lo_fence) & (values <= hi_fence)]
+    return {
+        "med": median,
+        "q1": q1,
+        "q3": q3,
+        "whislo": float(inside.min()) if inside.size else q1,
+        "whishi": float(inside.max()) if inside.size else q3,
+        "fliers": [],
+        "n_outliers": int(values.size - inside.size),
+    }
+
+
+# =========================
+# Figures from aggregates
+# =========================
+def plotly_histogram(hist: Dict[str, np.ndarray], title: str, x_label: str) -> go.Figure:
+    edges = hist["edges"]
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=hist["counts"],
+        width=np.diff(edges),
+        name=x_label,
+    ))
+    fig.update_layout(title=title, xaxis_title=x_label, yaxis_title="count", bargap=0.02)
+    return fig
+
+
+def mpl_histogram_kde(hist: Dict[str, np.ndarray], kde: Optional[Dict[str, np.ndarray]], title: str, x_label: str):
+    edges, counts = hist["edges"], hist["counts"]
+    fig, ax = plt.subplots(figsize=(12, 4))
+    ax.stairs(counts, edges, fill=True, alpha=0.6, edgecolor="black", linewidth=0.4)
+    if kde is not None:
+        # density -> counts per histogram bin, like seaborn's kde=True
+        scale = counts.sum() * np.diff(edges).mean()
+        ax.plot(kde["x"], kde["density"] * scale, linewidth=1.6)
+    ax.set_title(title)
+    ax.set_xlabel(x_label)
+    ax.set_ylabel("Count")
+    ax.grid(axis="y", linestyle="--", alpha=0.3)
+    return fig
+
+
+def mpl_boxplot(box: Dict[str, Any], title: str, x_label: str, figsize=(12, 2.5)):
+    fig, ax = plt.subplots(figsize=figsize)
+    ax.bxp([{k: v for k, v in box.items() if k != "n_outliers"}], vert=False, showfliers=False, widths=0.6)
+    ax.set_yticks([])
+    ax.set_title(title)
+    ax.set_xlabel(x_label)
+    ax.grid(axis="x", linestyle="--", alpha=0.3)
+    return fig
+
+
+# =========================
+# Bivariate: density grid instead of raw points
+# =========================
+def paired_values(x: pd.Series, y: pd.Series):
+    """
+    Float arrays of two columns restricted to rows where both are finite.
+    """
+    xv = x.to_numpy(dtype=np.float64, na_value=np.nan)
+    yv = y.to_numpy(dtype=np.float64, na_value=np.nan)
+    ok = np.isfinite(xv) & np.isfinite(yv)
+    return xv[ok], yv[ok]
+
+
+def density_grid(x: np.ndarray, y: np.ndarray, bins=(300, 200)) -> Dict[str, np.ndarray]:
+    """
+    Point counts on a 2D grid; counts[i, j] covers x bin i and y bin j.
+    """
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+    return {"x_edges": x_edges, "y_edges": y_edges, "counts": counts}
+
+
+def linear_fit(x: np.ndarray, y: np.ndarray) -> Optional[Dict[str, float]]:
+    """
+    Closed-form least-squares line y = slope * x + intercept, with R².
+    """
+    if x.size < 2:
+        return None
+    mx, my = x.mean(), y.mean()
+    dx, dy = x - mx, y - my
+    sxx = float(dx @ dx)
+    if sxx == 0:
+        return None
+    slope = float(dx @ dy) / sxx
+    syy = float(dy @ dy)
+    r2 = (float(dx @ dy) ** 2) / (sxx * syy) if syy > 0 else np.nan
+    return {"slope": slope, "intercept": my - slope * mx, "r2": r2, "x_min": float(x.min()), "x_max": float(x.max())}
+
+
+def plotly_density(grid: Dict[str, np.ndarray], fit: Optional[Dict[str, float]], title: str, x_label: str, y_label: str) -> go.Figure:
+    xe, ye = grid["x_edges"], grid["y_edges"]
+    z = grid["counts"].T.astype(np.float64)
+    z[z == 0] = np.nan  # empty cells stay transparent
+    fig = go.Figure(go.Heatmap(
+        x=(xe[:-1] + xe[1:]) / 2,
+        y=(ye[:-1] + ye[1:]) / 2,
+        z=np.log10(z),
+        colorscale="Viridis",
+        colorbar=dict(title="log10(count)"),
+        hovertemplate=f"{x_label}=%{{x}}<br>{y_label}=%{{y}}<br>log10(count)=%{{z:.2f}}<extra></extra>",
+    ))
+    if fit is not None:
+        xs = np.array([fit["x_min"], fit["x_max"]])
+        fig.add_trace(go.Scatter(
+            x=xs, y=fit["slope"] * xs + fit["intercept"],
+            mode="lines", name="OLS fit", line=dict(color="#F97316", width=2),
+        ))
+    fig.update_layout(title=title, xaxis_title=x_label, yaxis_title=y_label)
+    return fig
+
+
+def mpl_density(grid: Dict[str, np.ndarray], fit: Optional[Dict[str, float]], title: str, x_label: str, y_label: str):
+    fig, ax = plt.subplots(figsize=(10, 4))
+    counts = np.ma.masked_equal(grid["counts"].T, 0)
+    mesh = ax.pcolormesh(grid["x_edges"], grid["y_edges"], counts, norm=LogNorm(), cmap="viridis")
+    fig.colorbar(mesh, ax=ax, label="count")
+    if fit is not None:
+        xs = np.array([fit["x_min"], fit["x_max"]])
+        ax.plot(xs, fit["slope"] * xs + fit["intercept"], color="#F97316", linewidth=2)
+    ax.set_title(title)
+    ax.set_xlabel(x_label)
+    ax.set_ylabel(y_label)
+    ax.grid(True, linestyle="--", alpha=0.3)
+    return fig
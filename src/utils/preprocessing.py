@@ -0,0 +1,446 @@
+from __future__ import annotations
+
+import io
+import os
+import time
+from contextlib import nullcontext
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import parallel_config
+from scipy import sparse
+from sklearn.base import BaseEstimator, TransformerMixin, clone
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler, OneHotEncoder, RobustScaler, StandardScaler
+from threadpoolctl import threadpool_limits
+
+from src.config import (
+    BATCH_CHUNK_MAX_BYTES,
+    BATCH_CHUNK_ROWS,
+    BATCH_SAMPLE_ROWS,
+    PIPELINE_CACHE_MAX_BYTES,
+    PREPROCESS_MAX_MEMORY_FRACTION,
+)
+from src.utils.cache import BytesLRU, hash_file, make_key
+from src.utils.io import iter_file_chunks
+
+SCALERS = {
+    "StandardScaler": StandardScaler,
+    "MinMaxScaler": MinMaxScaler,
+    "RobustScaler": RobustScaler,
+}
+
+_pipeline_cache: Optional[BytesLRU] = None
+
+
+def preprocessing_config(
+    numeric_cols: List[str],
+    categorical_cols: List[str],
+    num_imputation: str = "mean",
+    num_constant: float = 0.0,
+    cat_imputation: str = "most_frequent",
+    cat_constant: str = "Unknown",
+    scaler: str = "StandardScaler",
+    sparse_output: bool = False,
+    float32: bool = False,
+    max_categories: Optional[int] = None,
+    min_frequency: Optional[float] = None,
+    n_jobs: int = 1,
+) -> Dict[str, Any]:
+    """
+    Plain-dict description of a preprocessing pipeline (stored in meta and
+    used to rebuild the transformer).
+    """
+    return {
+        "numeric_cols": list(numeric_cols),
+        "categorical_cols": list(categorical_cols),
+        "num_imputation": num_imputation,
+        "num_constant": float(num_constant),
+        "cat_imputation": cat_imputation,
+        "cat_constant": cat_constant,
+        "scaler": scaler,
+        "sparse_output": bool(sparse_output),
+        "float32": bool(float32),
+        "max_categories": int(max_categories) if max_categories else None,
+        "min_frequency": min_frequency or None,
+        "n_jobs": max(int(n_jobs), 1),
+    }
+
+
+def _numeric_branch(config: Dict[str, Any]) -> Pipeline:
+    strategy = config["num_imputation"]
+    steps = [("imputer", SimpleImputer(
+        strategy=strategy,
+        fill_value=config["num_constant"] if strategy == "constant" else None,
+    ))]
+    if config["scaler"] in SCALERS:
+        steps.append(("scaler", SCALERS[config["scaler"]]()))
+    return Pipeline(steps=steps)
+
+
+def _categorical_branch(config: Dict[str, Any]) -> Pipeline:
+    strategy = config["cat_imputation"]
+    min_frequency = config["min_frequency"]
+    if min_frequency is not None and min_frequency >= 1:
+        min_frequency = int(min_frequency)
+    return Pipeline(steps=[
+        ("imputer", SimpleImputer(
+            strategy=strategy,
+            fill_value=config["cat_constant"] if strategy == "constant" else None,
+        )),
+        ("encoder", OneHotEncoder(
+            handle_unknown="infrequent_if_exist" if config["max_categories"] or min_frequency else "ignore",
+            sparse_output=config["sparse_output"],
+            dtype=np.float32 if config["float32"] else np.float64,
+            max_categories=config["max_categories"],
+            min_frequency=min_frequency,
+        )),
+    ])
+
+
+def _column_blocks(name: str, cols: List[str], n_jobs: int) -> List[Tuple[str, List[str]]]:
+    """
+    Split cols into up to n_jobs contiguous blocks (one branch each), so a
+    wide frame gives every worker work. Every step is column-wise, so the
+    output (values and column order) is the same as a single branch.
+    """
+    if n_jobs <= 1 or len(cols) <= 1:
+        return [(name, list(cols))]
+    blocks = np.array_split(np.arange(len(cols)), min(n_jobs, len(cols)))
+    return [(f"{name}_{i + 1}", [cols[j] for j in block]) for i, block in enumerate(blocks)]
+
+
+def build_preprocessor(config: Dict[str, Any]) -> ColumnTransformer:
+    n_jobs = config["n_jobs"]
+    transformers = []
+    for name, cols in _column_blocks("num", config["numeric_cols"], n_jobs):
+        if cols:
+            transformers.append((name, _numeric_branch(config), cols))
+    for name, cols in _column_blocks("cat", config["categorical_cols"], n_jobs):
+        if cols:
+            transformers.append((name, _categorical_branch(config), cols))
+
+    return ColumnTransformer(
+        transformers=transformers,
+        remainder="drop",
+        # sparse mode: keep the stacked output CSR whatever its density
+        sparse_threshold=1.0 if config["sparse_output"] else 0.0,
+        n_jobs=n_jobs if n_jobs > 1 else None,
+        verbose_feature_names_out=False,
+    )
+
+
+class _TimedBranch(TransformerMixin, BaseEstimator):
+    """
+    Fits a branch and records how long that took, on the thread that ran it.
+    Only used while fitting; run_preprocessor unwraps the fitted branches.
+    """
+
+    def __init__(self, branch):
+        self.branch = branch
+
+    def fit(self, X, y=None):
+        t0 = time.perf_counter()
+        self.branch_ = clone(self.branch).fit(X, y)
+        self.fit_seconds_ = time.perf_counter() - t0
+        return self
+
+    def fit_transform(self, X, y=None):
+        t0 = time.perf_counter()
+        self.branch_ = clone(self.branch)
+        Xt = self.branch_.fit_transform(X, y)
+        self.fit_seconds_ = time.perf_counter() - t0
+        return Xt
+
+    def transform(self, X):
+        return self.branch_.transform(X)
+
+    def get_feature_names_out(self, input_features=None):
+        return self.branch_.get_feature_names_out(input_features)
+
+
+def _unwrap(transformers, fitted: bool):
+    attr = "branch_" if fitted else "branch"
+    return [(name, getattr(t, attr) if isinstance(t, _TimedBranch) else t, cols) for name, t, cols in transformers]
+
+
+def run_preprocessor(preprocessor: ColumnTransformer, method: str, df: pd.DataFrame) -> Tuple[Any, Dict[str, float]]:
+    """
+    preprocessor.<method>(df) ("fit", "fit_transform" or "transform") with
+    its branches on n_jobs threads. Fits also cap BLAS/OpenMP pools at
+    cpu_count // n_jobs threads each, so branches do not oversubscribe the
+    cores; transforms are elementwise and run uncapped. Returns
+    (result, {branch: fit seconds}); timings are empty for transform.
+    """
+    n_jobs = preprocessor.n_jobs or 1
+    fitting = method != "transform"
+    if fitting:
+        preprocessor.set_params(transformers=[
+            (name, _TimedBranch(t), cols) for name, t, cols in preprocessor.transformers
+        ])
+    # threadpool_limits is process-global and not serialized: fits in other
+    # sessions may briefly see (or restore) this cap, which only affects
+    # their speed, never their results
+    limits = threadpool_limits(limits=max((os.cpu_count() or 1) // n_jobs, 1)) if fitting else nullcontext()
+    try:
+        with limits, parallel_config(backend="threading"):
+            result = getattr(preprocessor, method)(df)
+    finally:
+        if fitting:
+            preprocessor.set_params(transformers=_unwrap(preprocessor.transformers, fitted=False))
+    if not fitting:
+        return result, {}
+    # keep the fitted pipeline free of _TimedBranch, so saved artifacts
+    # load with plain sklearn
+    timings = {name: t.fit_seconds_ for name, t, _ in preprocessor.transformers_ if isinstance(t, _TimedBranch)}
+    preprocessor.transformers_ = _unwrap(preprocessor.transformers_, fitted=True)
+    return result, timings
+
+
+def to_frame(X, feature_names, float32: bool = False) -> pd.DataFrame:
+    """
+    Transformer output as a DataFrame without a dense copy: CSR becomes
+    sparse columns, ndarrays are wrapped as is.
+    """
+    dtype = np.float32 if float32 else np.float64
+    if sparse.issparse(X):
+        frame = pd.DataFrame.sparse.from_spmatrix(X.astype(dtype, copy=False), columns=feature_names)
+        # from_spmatrix can tag float columns with a NaN fill value, which
+        # turns the implicit zeros into NaN: rewrap the stored values with 0
+        zero_fill = pd.SparseDtype(dtype, 0.0)
+        return pd.DataFrame({
+            name: pd.arrays.SparseArray(col.array.sp_values, sparse_index=col.array.sp_index, dtype=zero_fill)
+            for name, col in frame.items()
+        }, copy=False)
+    return pd.DataFrame(np.asarray(X, dtype=dtype), columns=feature_names, copy=False)
+
+
+def available_memory_bytes() -> Optional[int]:
+    """
+    Memory the OS can hand out now (MemAvailable on Linux), or None.
+    """
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def estimate_output(profile, config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Upper bound on the transformed frame's width and memory, from cached
+    distinct/missing counts (no data pass). Peak memory counts the encoder
+    blocks and the stacked result alive at the same time.
+    """
+    n = len(profile.df)
+    itemsize = 4 if config["float32"] else 8
+    distinct = profile.nunique()
+    missing = profile.missing_counts()
+
+    n_num = len(config["numeric_cols"])
+    n_onehot = 0
+    for c in config["categorical_cols"]:
+        k = int(distinct.get(c, 0))
+        if config["cat_imputation"] == "constant" and missing.get(c, 0) > 0:
+            k += 1
+        if config["max_categories"]:
+            k = min(k, config["max_categories"])
+        n_onehot += max(k, 1)
+
+    n_out = n_num + n_onehot
+    if config["sparse_output"]:
+        # CSR: one stored value per numeric cell and per categorical column
+        nnz = n * (n_num + len(config["categorical_cols"]))
+        index_size = 8 if nnz > np.iinfo(np.int32).max else 4
+        output = nnz * (itemsize + index_size) + (n + 1) * index_size
+    else:
+        output = n * n_out * itemsize
+    peak = 2 * output
+
+    available = available_memory_bytes()
+    limit = int(available * PREPROCESS_MAX_MEMORY_FRACTION) if available else None
+    return {
+        "rows": n,
+        "columns": n_out,
+        "output_bytes": int(output),
+        "peak_bytes": int(peak),
+        "available_bytes": available,
+        "limit_bytes": limit,
+        "fits": limit is None or peak <= limit,
+    }
+
+
+# =========================
+# Fitted pipeline artifacts
+# =========================
+def get_pipeline_cache() -> BytesLRU:
+    """
+    Fitted pipelines as joblib bytes, in memory. Keys on session datasets
+    include the dataset fingerprint, which no other session or restart can
+    reproduce, so nothing is written to disk.
+    """
+    global _pipeline_cache
+    if _pipeline_cache is None:
+        _pipeline_cache = BytesLRU(PIPELINE_CACHE_MAX_BYTES)
+    return _pipeline_cache
+
+
+def pipeline_key(config: Dict[str, Any], fingerprint: Optional[str]) -> str:
+    return make_key("pipeline", config, fingerprint)
+
+
+def store_pipeline(key: str, preprocessor: ColumnTransformer) -> None:
+    buf = io.BytesIO()
+    joblib.dump(preprocessor, buf)
+    get_pipeline_cache().put(key, buf.getvalue())
+
+
+def pipeline_bytes(key: str) -> Optional[bytes]:
+    """
+    The stored joblib artifact (for download), or None once evicted.
+    """
+    return get_pipeline_cache().get(key)
+
+
+def load_pipeline(key: str) -> Optional[ColumnTransformer]:
+    data = pipeline_bytes(key)
+    if data is None:
+        return None
+    try:
+        return joblib.load(io.BytesIO(data))
+    except Exception:
+        return None
+
+
+def fit_transform_cached(
+    df: pd.DataFrame, config: Dict[str, Any], fingerprint: Optional[str]
+) -> Tuple[Any, ColumnTransformer, Dict[str, Any]]:
+    """
+    (X, fitted preprocessor, info). The fitted preprocessor is kept as a
+    joblib artifact keyed by config + dataset fingerprint; the same config
+    on the same dataset version only runs transform().
+    """
+    t0 = time.perf_counter()
+    key = pipeline_key(config, fingerprint)
+    preprocessor = load_pipeline(key)
+    reused = preprocessor is not None
+    if reused:
+        X, branches = run_preprocessor(preprocessor, "transform", df)
+    else:
+        preprocessor = build_preprocessor(config)
+        X, branches = run_preprocessor(preprocessor, "fit_transform", df)
+        store_pipeline(key, preprocessor)
+    info = {"key": key, "reused": reused, "seconds": time.perf_counter() - t0, "branches": branches}
+    return X, preprocessor, info
+
+
+# =========================
+# Batch mode (out-of-core)
+# =========================
+def _align_chunk(chunk: pd.DataFrame, config: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Same dtypes for every chunk whatever each chunk's inference gave:
+    numeric columns as float64, categorical as object with NaN for missing
+    (an all-missing chunk would otherwise come back as float).
+    """
+    data = {}
+    for c in config["numeric_cols"]:
+        data[c] = pd.to_numeric(chunk[c], errors="coerce").astype("float64")
+    for c in config["categorical_cols"]:
+        s = chunk[c]
+        data[c] = s.astype(object).where(s.notna(), np.nan)
+    return pd.DataFrame(data, index=chunk.index)
+
+
+def _read_chunks(uploaded_file, config: Dict[str, Any], chunk_rows: int):
+    columns = config["numeric_cols"] + config["categorical_cols"]
+    # categorical CSV columns read as text, so a chunk of digits stays a category
+    dtype = {c: str for c in config["categorical_cols"]}
+    for chunk, frac in iter_file_chunks(uploaded_file, chunk_rows, columns=columns, dtype=dtype):
+        yield _align_chunk(chunk, config), frac
+
+
+def sample_chunks(chunks, n_rows: int, seed: int = 0) -> Tuple[pd.DataFrame, int]:
+    """
+    Uniform random sample of n_rows rows from a stream of (chunk, fraction)
+    in one pass, plus the total row count. Every row gets a random key and
+    the n_rows smallest keys are kept, so memory stays at n_rows + one chunk.
+    """
+    rng = np.random.default_rng(seed)
+    sample: Optional[pd.DataFrame] = None
+    keys = None
+    total = 0
+    for chunk, _ in chunks:
+        total += len(chunk)
+        k = rng.random(len(chunk))
+        if sample is not None:
+            chunk = pd.concat([sample, chunk], ignore_index=True)
+            k = np.concatenate([keys, k])
+        if len(chunk) > n_rows:
+            keep = np.sort(np.argpartition(k, n_rows)[:n_rows])
+            chunk = chunk.iloc[keep].reset_index(drop=True)
+            k = k[keep]
+        sample, keys = chunk, k
+    return (sample if sample is not None else pd.DataFrame()), total
+
+
+def fit_on_file_sample(
+    uploaded_file,
+    config: Dict[str, Any],
+    sample_rows: int = BATCH_SAMPLE_ROWS,
+    chunk_rows: int = BATCH_CHUNK_ROWS,
+) -> Tuple[ColumnTransformer, Dict[str, Any]]:
+    """
+    Fit the preprocessor on a uniform sample of a CSV/Parquet file read in
+    chunks. The fitted pipeline is cached like fit_transform_cached (keyed
+    by config + file content + sample size), so a second batch run over the
+    same file skips the sampling pass.
+    """
+    t0 = time.perf_counter()
+    key = pipeline_key(config, make_key("sample", hash_file(uploaded_file), int(sample_rows)))
+    preprocessor = load_pipeline(key)
+    info: Dict[str, Any] = {
+        "key": key, "reused": preprocessor is not None, "sample_rows": None, "total_rows": None, "branches": {},
+    }
+    if preprocessor is None:
+        sample, total = sample_chunks(_read_chunks(uploaded_file, config, int(chunk_rows)), int(sample_rows))
+        if sample.empty:
+            raise ValueError("The file has no rows.")
+        preprocessor = build_preprocessor(config)
+        _, info["branches"] = run_preprocessor(preprocessor, "fit", sample)
+        info.update(sample_rows=len(sample), total_rows=total)
+        store_pipeline(key, preprocessor)
+    info["seconds"] = time.perf_counter() - t0
+    return preprocessor, info
+
+
+def transform_file_chunks(
+    uploaded_file,
+    preprocessor: ColumnTransformer,
+    config: Dict[str, Any],
+    chunk_rows: int = BATCH_CHUNK_ROWS,
+) -> Iterator[Tuple[pd.DataFrame, float]]:
+    """
+    Stream a CSV/Parquet file through a fitted preprocessor: yields
+    (dense output chunk, fraction of the file done). Chunks are shrunk so
+    one output chunk stays under BATCH_CHUNK_MAX_BYTES however wide the
+    one-hot output is.
+    """
+    names = preprocessor.get_feature_names_out()
+    itemsize = 4 if config["float32"] else 8
+    rows = max(1, min(int(chunk_rows), BATCH_CHUNK_MAX_BYTES // max(len(names) * itemsize, 1)))
+    for chunk, frac in _read_chunks(uploaded_file, config, rows):
+        X, _ = run_preprocessor(preprocessor, "transform", chunk)
+        if sparse.issparse(X):
+            X = X.toarray()
+        yield to_frame(X, names, float32=config["float32"]), frac
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.config import PROFILE_STORE_SIZE, APPROX_ROW_THRESHOLD
+from src.utils.correlation import column_ranks, correlation_matrix, pair_correlation, top_abs_pairs
+from src.utils.stats import column_stats, describe_from_stats
+
+
+def new_fingerprint() -> str:
+    return uuid.uuid4().hex
+
+
+def dataset_fingerprint(session_state) -> Optional[str]:
+    """
+    Fingerprint of the dataset version currently in session.
+    set_dataframe_in_session() issues a new one for every new frame.
+    """
+    if session_state.get("df") is None:
+        return None
+    if not session_state.get("df_fingerprint"):
+        session_state["df_fingerprint"] = new_fingerprint()
+    return session_state["df_fingerprint"]
+
+
+class DatasetProfile:
+    """
+    Lazily computed, memoized statistics for one dataset version.
+    Each statistic is computed on first access and then served from the
+    results dict kept in the profile store.
+    """
+
+    def __init__(self, df: pd.DataFrame, fingerprint: str, results: Dict[str, Any], stats_mode: str = "auto"):
+        self.df = df
+        self.fingerprint = fingerprint
+        self._results = results
+        self.stats_mode = stats_mode
+
+    @property
+    def approximate(self) -> bool:
+        """
+        stats_mode "approx" / "exact" forces the choice; "auto" switches to
+        sketches above APPROX_ROW_THRESHOLD rows.
+        """
+        if self.stats_mode == "auto":
+            return len(self.df) > APPROX_ROW_THRESHOLD
+        return self.stats_mode == "approx"
+
+    def _memo(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        if key not in self._results:
+            self._results[key] = compute()
+        return self._results[key]
+
+    def cached(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Memoize any derived result (chart aggregates, ...) on this version.
+        Use a tuple key such as ("hist", column, bins): joining column names
+        into a string lets different columns collide.
+        """
+        return self._memo(("user", key), compute)
+
+    # -------------------------
+    # Structure
+    # -------------------------
+    def numeric_columns(self) -> list:
+        return self._memo("numeric_columns", lambda: self.df.select_dtypes(include="number").columns.tolist())
+
+    def categorical_columns(self) -> list:
+        num = set(self.numeric_columns())
+        return self._memo("categorical_columns", lambda: [c for c in self.df.columns if c not in num])
+
+    def dtypes(self) -> pd.Series:
+        return self._memo("dtypes", lambda: self.df.dtypes.astype(str))
+
+    # -------------------------
+    # Per-column statistics
+    # -------------------------
+    def missing_counts(self) -> pd.Series:
+        return self._memo("missing_counts", lambda: self.df.isna().sum().astype("int64"))
+
+    def missing_pct(self) -> pd.Series:
+        n = len(self.df)
+        return self._memo(
+            "missing_pct",
+            lambda: (self.missing_counts() / n * 100) if n else self.missing_counts().astype(float),
+        )
+
+    def column_stats(self, columns: Optional[Sequence] = None) -> pd.DataFrame:
+        """
+        stats.column_stats() rows, computed once per column and reused by
+        every page (a page asking for one column does not scan the rest).
+        """
+        columns = list(self.df.columns if columns is None else columns)
+        key = "column_stats_approx" if self.approximate else "column_stats"
+        cached = self._results.get(key)
+        todo = [c for c in columns if cached is None or c not in cached.index]
+        if todo:
+            fresh = column_stats(self.df, todo, approximate=self.approximate)
+            cached = fresh if cached is None else pd.concat([cached, fresh])
+            self._results[key] = cached
+        return cached.loc[columns]
+
+    def nunique(self) -> pd.Series:
+        return self.column_stats()["distinct"]
+
+    def describe(self) -> pd.DataFrame:
+        num_cols = self.numeric_columns()
+        return describe_from_stats(self.column_stats(num_cols)) if num_cols else pd.DataFrame()
+
+    def column_summary(self) -> pd.DataFrame:
+        """
+        One row per column: dtype, missing count/%, distinct values.
+        """
+        key = "column_summary_approx" if self.approximate else "column_summary"
+        return self._memo(key, lambda: pd.DataFrame({
+            "column": self.df.columns,
+            "dtype": self.dtypes().values,
+            "missing_count": self.missing_counts().values,
+            "missing_pct": self.missing_pct().values,
+            "unique_values": self.nunique().values,
+        }))
+
+    def error_bounds(self, columns: Optional[Sequence] = None) -> Dict[str, float]:
+        """
+        Worst error over the given columns: 95% relative error of distinct
+        counts and normalized rank error of quantiles (both 0 when exact).
+        """
+        stats = self.column_stats(columns)
+        return {
+            "distinct": float(stats["distinct_error"].max()) if len(stats) else 0.0,
+            "quantile_rank": float(stats["quantile_rank_error"].max()) if len(stats) else 0.0,
+        }
+
+    # -------------------------
+    # Frame-level statistics
+    # -------------------------
+    def duplicate_rows(self) -> int:
+        return self._memo("duplicate_rows", lambda: int(self.df.duplicated().sum()))
+
+    def ranks(self, column) -> np.ndarray:
+        """
+        Average ranks of one column (NaN kept), computed once per version and
+        shared by every Spearman computation.
+        """
+        return self._memo(("ranks", column), lambda: column_ranks(self.df[column]))
+
+    def pair_correlation(self, x, y, method: str = "pearson") -> float:
+        """
+        Correlation of two columns over rows where both are present.
+        Spearman is Pearson on the cached ranks, so no re-ranking per pair.
+        """
+        a, b = sorted((x, y), key=str)
+        key = ("pair", method, a, b)
+
+        def compute():
+            if method == "spearman":
+                return pair_correlation(self.ranks(x), self.ranks(y))
+            return pair_correlation(
+                self.df[x].to_numpy(dtype=np.float64, na_value=np.nan),
+                self.df[y].to_numpy(dtype=np.float64, na_value=np.nan),
+            )
+
+        return self._memo(key, compute)
+
+    def correlation(self, method: str = "pearson", columns: Optional[Sequence] = None) -> pd.DataFrame:
+        columns = list(self.numeric_columns() if columns is None else columns)
+        key = ("corr", method, tuple(columns))
+        return self._memo(key, lambda: correlation_matrix(self.df, columns, method=method, rank_of=self.ranks)[0])
+
+    def top_correlated_pairs(self, k: int = 20, method: str = "pearson", columns: Optional[Sequence] = None) -> pd.DataFrame:
+        """
+        Top-k |r| pairs without materializing the full matrix.
+        """
+        columns = list(self.numeric_columns() if columns is None else columns)
+        key = ("top_pairs", method, k, tuple(columns))
+        return self._memo(key, lambda: top_abs_pairs(self.df, k, columns, method=method, rank_of=self.ranks))
+
+
+def get_profile(session_state) -> Optional[DatasetProfile]:
+    """
+    Profile of the dataset currently in session. Results are stored per
+    fingerprint (bounded LRU), so switching pages never rescans the frame.
+    """
+    df = session_state.get("df")
+    fp = dataset_fingerprint(session_state)
+    if df is None or fp is None:
+        return None
+
+    store = session_state.get("profile_store")
+    if store is None:
+        store = OrderedDict()
+        session_state["profile_store"] = store
+
+    results = store.get(fp)
+    if results is None:
+        results = {}
+        store[fp] = results
+        while len(store) > PROFILE_STORE_SIZE:
+            store.popitem(last=False)
+    else:
+        store.move_to_end(fp)
+
+    return DatasetProfile(df, fp, results, session_state.get("stats_mode", "auto"))
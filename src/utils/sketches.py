@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from typing import List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.config import HLL_PRECISION, QUANTILE_SKETCH_K
+
+
+def hash_values(s: pd.Series) -> np.ndarray:
+    """
+    64-bit hashes of the non-null values of a Series (any dtype).
+    """
+    return pd.util.hash_pandas_object(s.dropna(), index=False).to_numpy(dtype=np.uint64)
+
+
+def _bit_length(w: np.ndarray) -> np.ndarray:
+    """
+    Exact bit length of uint64 values (0 for 0), split in 32-bit halves so
+    the float conversion inside frexp is lossless.
+    """
+    hi = (w >> np.uint64(32)).astype(np.float64)
+    lo = (w & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    bl_hi = np.frexp(hi)[1]
+    bl_lo = np.frexp(lo)[1]
+    return np.where(hi > 0, 32 + bl_hi, bl_lo)
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct counter with 2**p one-byte registers.
+    Relative standard error is about 1.04 / sqrt(2**p).
+    """
+
+    def __init__(self, p: int = HLL_PRECISION):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def update_hashes(self, h: np.ndarray) -> None:
+        if h.size == 0:
+            return
+        h = h.astype(np.uint64, copy=False)
+        idx = (h >> np.uint64(64 - self.p)).astype(np.intp)
+        rest = h & np.uint64((1 << (64 - self.p)) - 1)
+        rank = ((64 - self.p) - _bit_length(rest) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def update(self, s: pd.Series) -> None:
+        self.update_hashes(hash_values(s))
+
+    def estimate(self) -> float:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int((self.registers == 0).sum())
+        if raw <= 2.5 * m and zeros:
+            return m * np.log(m / zeros)  # linear counting for small cardinalities
+        return float(raw)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / np.sqrt(self.m)
+
+
+class QuantileSketch:
+    """
+    KLL-style compactor hierarchy. Level h holds items of weight 2**h; a full
+    level is sorted and every other item (random offset) is promoted.
+    Each compaction at level h moves any rank by at most 2**h, so
+    rank_error is a hard (deterministic) bound on the normalized rank error.
+    """
+
+    def __init__(self, k: int = QUANTILE_SKETCH_K, seed: int = 0):
+        self.k = k
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.n = 0
+        self._abs_error = 0.0
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        self.n += values.size
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        h = 0
+        while h < len(self.levels):
+            if self.levels[h].size > self.k:
+                self._compact(h)
+            h += 1
+
+    def _compact(self, h: int) -> None:
+        buf = np.sort(self.levels[h])
+        keep = buf[-1:] if buf.size % 2 else buf[:0]
+        if buf.size % 2:
+            buf = buf[:-1]
+        promoted = buf[int(self._rng.integers(2))::2]
+        self.levels[h] = keep
+        if h + 1 == len(self.levels):
+            self.levels.append(np.empty(0))
+        self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+        self._abs_error += 2.0 ** h
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        items = np.concatenate(self.levels)
+        if items.size == 0:
+            return np.full(len(qs), np.nan)
+        weights = np.concatenate([np.full(lv.size, 2.0 ** h) for h, lv in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cum = items[order], np.cumsum(weights[order])
+        targets = np.asarray(qs, dtype=np.float64) * cum[-1]
+        pos = np.searchsorted(cum, targets, side="left").clip(0, items.size - 1)
+        return items[pos]
+
+    @property
+    def rank_error(self) -> float:
+        return self._abs_error / self.n if self.n else 0.0
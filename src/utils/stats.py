@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import warnings
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config import STATS_BLOCK_COLUMNS, APPROX_CHUNK_ROWS
+from src.utils.sketches import HyperLogLog, QuantileSketch, hash_values
+
+
+STAT_COLUMNS = [
+    "count", "missing", "distinct", "mean", "std", "var",
+    "min", "q1", "median", "q3", "max",
+]
+# 0 for exact results; for approximate ones, the 95% relative error of
+# `distinct` and the bound on the normalized rank error of the quantiles
+ERROR_COLUMNS = ["distinct_error", "quantile_rank_error"]
+
+# Outlier rules and their default threshold k:
+# IQR: [q1 - k*IQR, q3 + k*IQR]; Z-score: mean ± k*std;
+# MAD: median ± k * 1.4826 * MAD (1.4826 * MAD estimates std for normal data)
+OUTLIER_METHODS = {"IQR": 1.5, "Z-score": 3.0, "MAD": 3.5}
+MAD_SCALE = 1.4826
+
+
+def is_numeric_column(s: pd.Series) -> bool:
+    # same rule as select_dtypes(include="number"): booleans are not numeric here
+    return pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s)
+
+
+def _as_float(s: pd.Series) -> np.ndarray:
+    return s.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _numeric_blocks(df: pd.DataFrame, columns: List) -> Iterator[Tuple[List, np.ndarray]]:
+    """
+    (column names, float64 rows x columns block) for STATS_BLOCK_COLUMNS
+    columns at a time, so at most one block is materialized.
+    """
+    for start in range(0, len(columns), STATS_BLOCK_COLUMNS):
+        chunk = columns[start:start + STATS_BLOCK_COLUMNS]
+        block = np.empty((len(df), len(chunk)), dtype=np.float64, order="F")
+        for j, c in enumerate(chunk):
+            block[:, j] = _as_float(df[c])
+        yield chunk, block
+
+
+def _sorted_quantile(sorted_block: np.ndarray, counts: np.ndarray, q: float) -> np.ndarray:
+    """
+    Linear-interpolated quantile (pandas default) of each column of a block
+    sorted along axis 0 with NaN last; counts = non-NaN values per column.
+    """
+    out = np.full(sorted_block.shape[1], np.nan)
+    ok = counts > 0
+    if not ok.any():
+        return out
+    pos = q * (counts[ok] - 1)
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.ceil(pos).astype(np.intp)
+    cols = np.nonzero(ok)[0]
+    v_lo = sorted_block[lo, cols]
+    v_hi = sorted_block[hi, cols]
+    out[ok] = v_lo + (v_hi - v_lo) * (pos - lo)
+    return out
+
+
+def _valid_sorted_pairs(count: np.ndarray, n_rows: int) -> np.ndarray:
+    """
+    Mask over np.diff of a NaN-last sorted block: pair i is valid when both
+    rows i and i+1 hold non-NaN values, i.e. i + 1 < count.
+    """
+    return (np.arange(1, n_rows)[:, None] < count[None, :])
+
+
+def _numeric_block_stats(block: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    All statistics for a (rows x columns) float block: one sort plus
+    column-wise sums.
+    """
+    n_rows = block.shape[0]
+    valid = ~np.isnan(block)
+    count = valid.sum(axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        total = np.where(valid, block, 0.0).sum(axis=0)
+        mean = np.where(count > 0, total / count, np.nan)
+        centered = np.where(valid, block - mean, 0.0)
+        var = np.where(count > 1, (centered ** 2).sum(axis=0) / (count - 1), np.nan)
+    del centered
+
+    srt = np.sort(block, axis=0)  # NaN sorts last
+    cols = np.arange(block.shape[1])
+    has = count > 0
+    last = np.maximum(count - 1, 0)
+    vmin = np.where(has, srt[0, cols] if n_rows else np.nan, np.nan)
+    vmax = np.where(has, srt[last, cols] if n_rows else np.nan, np.nan)
+
+    # distinct = 1 + number of value changes among the sorted non-NaN values
+    if n_rows > 1:
+        changes = (np.diff(srt, axis=0) != 0) & _valid_sorted_pairs(count, n_rows)
+        distinct = np.where(has, changes.sum(axis=0) + 1, 0)
+    else:
+        distinct = has.astype(np.int64)
+
+    return {
+        "count": count,
+        "missing": n_rows - count,
+        "distinct": distinct,
+        "mean": mean,
+        "std": np.sqrt(var),
+        "var": var,
+        "min": vmin,
+        "q1": _sorted_quantile(srt, count, 0.25),
+        "median": _sorted_quantile(srt, count, 0.50),
+        "q3": _sorted_quantile(srt, count, 0.75),
+        "max": vmax,
+    }
+
+
+def _other_column_stats(s: pd.Series) -> Dict[str, float]:
+    codes, _ = pd.factorize(s, use_na_sentinel=True)
+    missing = int((codes < 0).sum())
+    distinct = int(codes.max() + 1) if len(codes) else 0
+    row = {k: np.nan for k in STAT_COLUMNS}
+    row.update(count=len(s) - missing, missing=missing, distinct=max(distinct, 0))
+    return row
+
+
+def _approx_column_stats(s: pd.Series) -> Dict[str, float]:
+    """
+    Bounded-memory statistics in row chunks: exact count / mean / variance /
+    min / max, HyperLogLog distinct count and sketched quantiles.
+    """
+    hll = HyperLogLog()
+    numeric = is_numeric_column(s)
+    sketch = QuantileSketch() if numeric else None
+    count, shift, total, total_sq = 0, None, 0.0, 0.0
+    vmin, vmax = np.inf, -np.inf
+
+    for start in range(0, len(s), APPROX_CHUNK_ROWS):
+        part = s.iloc[start:start + APPROX_CHUNK_ROWS]
+        hll.update_hashes(hash_values(part))
+        if not numeric:
+            count += int(part.notna().sum())
+            continue
+        x = _as_float(part)
+        x = x[~np.isnan(x)]
+        if x.size == 0:
+            continue
+        sketch.update(x)
+        if shift is None:
+            shift = x[0]  # shifted sums keep the variance numerically stable
+        d = x - shift
+        count += x.size
+        total += d.sum()
+        total_sq += (d * d).sum()
+        vmin, vmax = min(vmin, x.min()), max(vmax, x.max())
+
+    row = {k: np.nan for k in STAT_COLUMNS}
+    row.update(
+        count=count,
+        missing=len(s) - count,
+        distinct=int(round(hll.estimate())) if count else 0,
+        distinct_error=2 * hll.relative_error,
+        quantile_rank_error=0.0,
+    )
+    if numeric and count:
+        mean_d = total / count
+        var = (total_sq - count * mean_d ** 2) / (count - 1) if count > 1 else np.nan
+        q1, med, q3 = sketch.quantiles([0.25, 0.5, 0.75])
+        row.update(
+            mean=shift + mean_d, var=var, std=np.sqrt(var) if var == var else np.nan,
+            min=vmin, max=vmax, q1=q1, median=med, q3=q3,
+            quantile_rank_error=sketch.rank_error,
+        )
+    return row
+
+
+def column_stats(df: pd.DataFrame, columns: Optional[Sequence] = None, approximate: bool = False) -> pd.DataFrame:
+    """
+    count, missing, distinct, mean, std, var, min, q1, median, q3, max for
+    many columns at once. Numeric columns are processed in batched NumPy
+    blocks of STATS_BLOCK_COLUMNS columns (one sort per block); other
+    columns get count / missing / distinct only.
+
+    approximate=True streams each column in row chunks instead, with
+    HyperLogLog distinct counts and quantile sketches; the error bounds are
+    reported in the distinct_error / quantile_rank_error columns.
+    Returns a frame indexed by column name.
+    """
+    columns = list(df.columns if columns is None else columns)
+    if approximate:
+        out = pd.DataFrame.from_dict(
+            {c: _approx_column_stats(df[c]) for c in columns},
+            orient="index",
+            columns=STAT_COLUMNS + ERROR_COLUMNS,
+        ).reindex(columns)
+        for k in ("count", "missing", "distinct"):
+            out[k] = out[k].astype(np.int64)
+        return out
+
+    num = [c for c in columns if is_numeric_column(df[c])]
+    rows: Dict[object, Dict[str, float]] = {}
+
+    for chunk, block in _numeric_blocks(df, num):
+        res = _numeric_block_stats(block)
+        del block
+        for j, c in enumerate(chunk):
+            rows[c] = {k: res[k][j] for k in STAT_COLUMNS}
+
+    for c in columns:
+        if c not in rows:
+            rows[c] = _other_column_stats(df[c])
+
+    out = pd.DataFrame.from_dict(rows, orient="index", columns=STAT_COLUMNS).reindex(columns)
+    out[ERROR_COLUMNS] = 0.0
+    for k in ("count", "missing", "distinct"):
+        out[k] = out[k].astype(np.int64)
+    return out
+
+
+def describe_from_stats(stats: pd.DataFrame) -> pd.DataFrame:
+    """
+    Same layout as df.describe().T, built from column_stats() rows.
+    """
+    out = stats[["count", "mean", "std", "min", "q1", "median", "q3", "max"]].copy()
+    out.columns = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+    out["count"] = out["count"].astype(float)
+    return out
+
+
+def iqr_bounds(q1: float, q3: float, k: float = 1.5) -> Tuple[float, float]:
+    iqr = q3 - q1
+    return q1 - k * iqr, q3 + k * iqr
+
+
+def column_mad(df: pd.DataFrame, columns: Sequence, medians: pd.Series) -> pd.Series:
+    """
+    Median absolute deviation from the given medians, per column, in the
+    same column blocks as column_stats() (deviations computed in place).
+    """
+    out: Dict[object, float] = {}
+    for chunk, block in _numeric_blocks(df, list(columns)):
+        np.subtract(block, medians.reindex(chunk).to_numpy(dtype=np.float64), out=block)
+        np.abs(block, out=block)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns
+            mad = np.nanmedian(block, axis=0, overwrite_input=True) if len(block) else np.full(len(chunk), np.nan)
+        out.update(zip(chunk, mad))
+    return pd.Series(out, dtype=np.float64).reindex(list(columns))
+
+
+def outlier_bounds(
+    stats: pd.DataFrame, method: str = "IQR", k: Optional[float] = None, mad: Optional[pd.Series] = None
+) -> pd.DataFrame:
+    """
+    lower / upper bounds for every column of a column_stats() frame at
+    once; method is an OUTLIER_METHODS key ("MAD" also needs column_mad()).
+    """
+    if method not in OUTLIER_METHODS:
+        raise ValueError(f"Unknown outlier method: {method}")
+    k = OUTLIER_METHODS[method] if k is None else k
+    if method == "IQR":
+        lower, upper = iqr_bounds(stats["q1"], stats["q3"], k)
+    else:
+        if method == "Z-score":
+            center, spread = stats["mean"], k * stats["std"]
+        else:
+            center, spread = stats["median"], k * MAD_SCALE * mad.reindex(stats.index)
+        lower, upper = center - spread, center + spread
+    return pd.DataFrame({"lower": lower, "upper": upper}, index=stats.index).astype(np.float64)
+
+
+def outlier_scan(df: pd.DataFrame, bounds: pd.DataFrame) -> Tuple[pd.Series, np.ndarray]:
+    """
+    One vectorized pass over the columns of `bounds`: outlier count per
+    column and a row mask of rows with an outlier in any of them.
+    Missing values are never outliers.
+    """
+    columns = bounds.index.tolist()
+    any_row = np.zeros(len(df), dtype=bool)
+    counts: Dict[object, int] = {}
+    for chunk, block in _numeric_blocks(df, columns):
+        lo = bounds.loc[chunk, "lower"].to_numpy()
+        hi = bounds.loc[chunk, "upper"].to_numpy()
+        hit = (block < lo) | (block > hi)
+        del block
+        counts.update(zip(chunk, hit.sum(axis=0)))
+        any_row |= hit.any(axis=1)
+    return pd.Series(counts, dtype=np.int64).reindex(columns), any_row
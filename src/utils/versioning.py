@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.config import DATASET_HISTORY_SIZE
+from src.utils.profiling import new_fingerprint
+
+
+@dataclass
+class Delta:
+    """
+    One transform, stored as what changed relative to its parent version.
+    Applied in order: row_mask, dropped, changed. `frame` replaces the
+    whole dataset (e.g. preprocessing output) and ignores the rest.
+    """
+    label: str
+    meta: Dict[str, Any]
+    row_mask: Optional[np.ndarray] = None
+    dropped: List[str] = field(default_factory=list)
+    changed: Dict[str, pd.Series] = field(default_factory=dict)
+    frame: Optional[pd.DataFrame] = None
+    fingerprint: str = field(default_factory=new_fingerprint)
+
+    def apply(self, parent: pd.DataFrame) -> pd.DataFrame:
+        if self.frame is not None:
+            return self.frame
+
+        out = parent
+        if self.row_mask is not None:
+            out = out.loc[self.row_mask]
+        if self.dropped:
+            out = out.drop(columns=self.dropped)
+        if self.changed:
+            cols = out.columns.tolist() + [c for c in self.changed if c not in out.columns]
+            # unchanged columns are passed through, not copied
+            out = pd.DataFrame(
+                {c: self.changed[c] if c in self.changed else out[c] for c in cols},
+                index=out.index,
+                copy=False,
+            )
+        return out
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "label": self.label,
+            "rows_removed": int((~self.row_mask).sum()) if self.row_mask is not None else 0,
+            "dropped": list(self.dropped),
+            "changed": list(self.changed),
+            "replaced": self.frame is not None,
+        }
+
+
+class DatasetStore:
+    """
+    Versioned dataset: a root frame plus a bounded list of deltas.
+    Only the current version is materialized; undo replays the deltas from
+    the root, redo re-applies a delta on top of the current frame.
+    """
+
+    def __init__(self, df: pd.DataFrame, meta: Dict[str, Any], max_history: int = DATASET_HISTORY_SIZE):
+        self.max_history = max_history
+        self._root = df
+        self._root_meta = meta
+        self._root_fingerprint = new_fingerprint()
+        self._deltas: List[Delta] = []
+        self._redo: List[Delta] = []
+        self._current = df
+
+    # -------------------------
+    # Current version
+    # -------------------------
+    @property
+    def df(self) -> pd.DataFrame:
+        return self._current
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        return self._deltas[-1].meta if self._deltas else self._root_meta
+
+    @property
+    def fingerprint(self) -> str:
+        return self._deltas[-1].fingerprint if self._deltas else self._root_fingerprint
+
+    # -------------------------
+    # History
+    # -------------------------
+    def apply(self, delta: Delta) -> pd.DataFrame:
+        self._current = delta.apply(self._current)
+        self._deltas.append(delta)
+        self._redo.clear()
+        while len(self._deltas) > self.max_history:
+            # fold the oldest step into the root
+            oldest = self._deltas.pop(0)
+            self._root = oldest.apply(self._root)
+            self._root_meta = oldest.meta
+            self._root_fingerprint = oldest.fingerprint
+        return self._current
+
+    def can_undo(self) -> bool:
+        return bool(self._deltas)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def undo(self) -> pd.DataFrame:
+        if not self._deltas:
+            return self._current
+        self._redo.append(self._deltas.pop())
+        df = self._root
+        for d in self._deltas:
+            df = d.apply(df)
+        self._current = df
+        return df
+
+    def redo(self) -> pd.DataFrame:
+        if not self._redo:
+            return self._current
+        delta = self._redo.pop()
+        self._current = delta.apply(self._current)
+        self._deltas.append(delta)
+        return self._current
+
+    def history(self) -> List[Dict[str, Any]]:
+        return [d.describe() for d in self._deltas]
+
+
+# -------------------------
+# Session helpers
+# -------------------------
+def _sync(session_state, store: DatasetStore) -> None:
+    session_state["df"] = store.df
+    session_state["df_meta"] = store.meta
+    session_state["df_fingerprint"] = store.fingerprint
+
+
+def start_history(df: pd.DataFrame, meta: Dict[str, Any], session_state) -> DatasetStore:
+    store = DatasetStore(df, meta)
+    session_state["dataset_store"] = store
+    _sync(session_state, store)
+    return store
+
+
+def get_store(session_state) -> Optional[DatasetStore]:
+    store = session_state.get("dataset_store")
+    if store is None and session_state.get("df") is not None:
+        # dataset placed in session without history: adopt it as the root
+        store = start_history(session_state["df"], session_state.get("df_meta") or {}, session_state)
+    return store
+
+
+def apply_transform(
+    session_state,
+    label: str,
+    meta: Optional[Dict[str, Any]] = None,
+    row_mask=None,
+    dropped: Optional[List[str]] = None,
+    changed: Optional[Dict[str, pd.Series]] = None,
+    frame: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """
+    Record a transform on the session dataset as a delta and make the
+    result the current version. Returns the new frame.
+    """
+    store = get_store(session_state)
+    if store is None:
+        raise ValueError("No dataset in session.")
+    if row_mask is not None:
+        row_mask = np.asarray(row_mask, dtype=bool)
+    delta = Delta(
+        label=label,
+        meta=meta if meta is not None else dict(store.meta or {}),
+        row_mask=row_mask,
+        dropped=list(dropped or []),
+        changed=dict(changed or {}),
+        frame=frame,
+    )
+    store.apply(delta)
+    _sync(session_state, store)
+    return store.df
+
+
+def undo(session_state) -> None:
+    store = get_store(session_state)
+    if store is not None and store.can_undo():
+        store.undo()
+        _sync(session_state, store)
+
+
+def redo(session_state) -> None:
+    store = get_store(session_state)
+    if store is not None and store.can_redo():
+        store.redo()
+        _sync(session_state, store)
@@ -0,0 +1,51 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from src.utils.export import ARROW_FORMATS, write_arrow, write_frames
+
+
+def _object_text_frame():
+    return pd.DataFrame({
+        "num": np.arange(6),
+        "text": pd.Series(["a", None, "c", "d", "e", "f"], dtype=object),
+        # missing in the whole first slice, text later on
+        "late": pd.Series([None, None, None, "x", None, "y"], dtype=object),
+    })
+
+
+def _read(buf, fmt):
+    buf.seek(0)
+    if fmt == "parquet":
+        return pq.read_table(buf)
+    if fmt == "feather":
+        return pa.ipc.open_file(buf).read_all()
+    return pa.ipc.open_stream(buf).read_all()
+
+
+@pytest.mark.parametrize("fmt", list(ARROW_FORMATS))
+def test_write_arrow_object_text_columns(fmt):
+    df = _object_text_frame()
+    buf = io.BytesIO()
+    info = write_arrow(df, buf, fmt=fmt, row_group_rows=2)
+
+    table = _read(buf, fmt)
+    assert info["rows"] == len(df)
+    assert table.schema.field("text").type == pa.string()
+    assert table.schema.field("late").type == pa.string()
+    assert table.column("text").to_pylist() == df["text"].tolist()
+    assert table.column("late").to_pylist() == df["late"].tolist()
+
+
+def test_write_frames_object_text_columns():
+    df = _object_text_frame()
+    buf = io.BytesIO()
+    write_frames([(df.iloc[:3], 0.5), (df.iloc[3:], 1.0)], buf, fmt="parquet")
+
+    table = _read(buf, "parquet")
+    assert table.num_rows == len(df)
+    assert table.column("late").to_pylist() == df["late"].tolist()